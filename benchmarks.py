@@ -0,0 +1,299 @@
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+
+# Budget for `import main` in a fresh interpreter, in seconds
+COLD_START_BUDGET = float(os.getenv("COLD_START_BUDGET", "3.0"))
+
+
+def bench_cold_start(runs: int = 5, budget: float = COLD_START_BUDGET) -> Dict[str, float]:
+    """
+    Measure how long a fresh interpreter takes to import the dashboard.
+
+    Each run spawns a new Python process so module caches never carry over between runs.
+
+    Parameters:
+    runs (int): Number of fresh interpreters to time (default is 5).
+    budget (float): Cold-start budget in seconds.
+
+    Returns:
+    dict: Best, median and worst import times, and whether the median fits the budget.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    result = {
+        "best": timings[0],
+        "median": timings[len(timings) // 2],
+        "worst": timings[-1],
+        "within_budget": timings[len(timings) // 2] <= budget,
+    }
+    print(f"Cold start: median {result['median']:.2f}s (best {result['best']:.2f}s, worst {result['worst']:.2f}s), budget {budget:.2f}s")
+    return result
+
+
+# Fixed corpus of short finance texts, repeated to get stable timings
+SENTIMENT_CORPUS = [
+    "Shares surged after the company beat quarterly earnings expectations.",
+    "The stock plunged as regulators opened an investigation into the firm.",
+    "Analysts remain neutral ahead of next week's product announcement.",
+    "Revenue guidance was cut for the second time this year.",
+    "I just bought more shares, this dip is a gift.",
+    "Management announced layoffs affecting ten percent of staff.",
+    "The new chip is selling out everywhere, demand looks insane.",
+    "Dividend maintained, buyback program extended through next year.",
+    "Honestly I think this company is overvalued and heading for a crash.",
+    "Supply chain issues continue to weigh on margins.",
+    "Record deliveries this quarter pushed the stock to an all-time high.",
+    "Is anyone else worried about the debt load here?",
+]
+
+
+def bench_sentiment_backends(text_type: str = "text", repeats: int = 20, batch_size: int = 32) -> Dict[str, float]:
+    """
+    Compare throughput and score agreement of the int8 CPU backend against the FP32 model.
+
+    Parameters:
+    text_type (str): "text" or "news" to choose the model.
+    repeats (int): How many times the fixed corpus is repeated (default is 20).
+    batch_size (int): Inference batch size (default is 32).
+
+    Returns:
+    dict: Texts per second of each backend, label agreement ratio and mean absolute score gap.
+    """
+    from text_analysis import get_pipeline, score_texts
+
+    corpus = SENTIMENT_CORPUS * repeats
+    results = {}
+    for backend in ["fp32", "int8"]:
+        get_pipeline(text_type, backend, device="cpu")  # Load outside the timed section
+        start = time.perf_counter()
+        results[backend] = score_texts(text_type, corpus, batch_size, backend=backend, device="cpu")
+        elapsed = time.perf_counter() - start
+        results[f"{backend}_texts_per_second"] = len(corpus) / elapsed
+
+    agreement = sum(a[1] == b[1] for a, b in zip(results["fp32"], results["int8"])) / len(corpus)
+    score_gap = sum(abs(a[0] - b[0]) for a, b in zip(results["fp32"], results["int8"])) / len(corpus)
+    report = {
+        "fp32_texts_per_second": results["fp32_texts_per_second"],
+        "int8_texts_per_second": results["int8_texts_per_second"],
+        "label_agreement": agreement,
+        "mean_abs_score_gap": score_gap,
+    }
+    print(
+        f"{text_type}: fp32 {report['fp32_texts_per_second']:.1f} texts/s, int8 {report['int8_texts_per_second']:.1f} texts/s, "
+        f"label agreement {agreement:.1%}, mean score gap {score_gap:.3f}"
+    )
+    return report
+
+
+def bench_bulk_update(keyword: str, sizes=(10_000, 100_000, 1_000_000)) -> Dict[int, Dict[str, float]]:
+    """
+    Compare the COPY-based bulk writer against per-row `bulk_update_mappings` on a scratch table.
+
+    The table is created in the tenant's database, filled with ids only, and dropped afterwards.
+
+    Parameters:
+    keyword (str): The tenant to run against.
+    sizes (tuple): Row counts to time (default is 10k, 100k and 1M).
+
+    Returns:
+    dict: Seconds taken by each path, and the speedup, per row count.
+    """
+    from sqlalchemy import Column, Float, Integer, String, Text, text
+    from sqlalchemy.orm import declarative_base
+    from db_manager import bulk_update, create_engine_and_sessions, get_session
+
+    Base = declarative_base()
+
+    class BenchRow(Base):
+        __tablename__ = "bench_bulk_update"
+        id = Column(Integer, primary_key=True)
+        sentiment_score = Column(Float)
+        sentiment_label = Column(String)
+        keywords = Column(Text)
+
+    db_info = create_engine_and_sessions(keyword)
+    engine = db_info["engine"]
+    report = {}
+    try:
+        for size in sizes:
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO bench_bulk_update (id) SELECT generate_series(1, :size)"), {"size": size})
+            rows = [
+                {"id": row_id, "sentiment_score": (row_id % 200) / 100 - 1, "sentiment_label": "positive", "keywords": "stock, earnings, "}
+                for row_id in range(1, size + 1)
+            ]
+
+            timings = {}
+            with get_session(db_info["SessionLocal"]) as session:
+                start = time.perf_counter()
+                session.bulk_update_mappings(BenchRow, rows)
+                session.commit()
+                timings["bulk_update_mappings"] = time.perf_counter() - start
+
+                start = time.perf_counter()
+                bulk_update(session, BenchRow, rows)
+                timings["copy"] = time.perf_counter() - start
+            timings["speedup"] = timings["bulk_update_mappings"] / timings["copy"]
+            report[size] = timings
+            print(f"Bulk update of {size} rows: bulk_update_mappings {timings['bulk_update_mappings']:.2f}s, COPY {timings['copy']:.2f}s ({timings['speedup']:.1f}x)")
+    finally:
+        Base.metadata.drop_all(engine)
+    return report
+
+
+def bench_keyword_extraction(repeats: int = 2000, workers: int = None, min_score: int = 1) -> Dict[str, float]:
+    """
+    Compare the NLTK-tokenized `extract_words` with the regex-tokenized parallel extraction.
+
+    Parameters:
+    repeats (int): How many times the fixed corpus is repeated (default is 2000).
+    workers (int): Worker processes for the parallel path. Defaults to the number of cores.
+    min_score (int): Minimum keyword score (default is 1).
+
+    Returns:
+    dict: Documents per second of each path, the speedup and the share of documents with identical keywords.
+    """
+    from text_analysis import extract_rows_parallel, extract_words
+
+    workers = workers or os.cpu_count() or 1
+    # Two-sentence documents, closer to a post than a single headline
+    corpus = [f"{a}\n{b}" for a, b in zip(SENTIMENT_CORPUS, SENTIMENT_CORPUS[1:] + SENTIMENT_CORPUS[:1])] * repeats
+
+    start = time.perf_counter()
+    baseline = [extract_words(text, min_score=min_score) for text in corpus]
+    baseline_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Joined the way extract_words formats its keywords, so both paths produce the same strings
+    extracted = {
+        position: "".join(f"{term}, " for term, _ in keywords)
+        for shard in extract_rows_parallel(list(enumerate(corpus)), min_score, workers)
+        for position, keywords in shard
+    }
+    parallel_seconds = time.perf_counter() - start
+
+    report = {
+        "baseline_docs_per_second": len(corpus) / baseline_seconds,
+        "parallel_docs_per_second": len(corpus) / parallel_seconds,
+        "speedup": baseline_seconds / parallel_seconds,
+        "identical": sum(baseline[position] == extracted[position] for position in range(len(corpus))) / len(corpus),
+    }
+    print(
+        f"Keywords: extract_words {report['baseline_docs_per_second']:.0f} docs/s, "
+        f"{workers} workers {report['parallel_docs_per_second']:.0f} docs/s ({report['speedup']:.1f}x), "
+        f"identical output {report['identical']:.1%}"
+    )
+    return report
+
+
+def bench_wordcloud(renders: int = 10, image_format: str = "png") -> Dict[str, float]:
+    """
+    Compare per-render latency of the former pyplot word cloud path with the direct and cached paths.
+
+    Parameters:
+    renders (int): Number of renders timed per path (default is 10).
+    image_format (str): "png" or "webp" for the new path.
+
+    Returns:
+    dict: Mean milliseconds per render for each path, and the encoded image sizes.
+    """
+    import base64
+    import io
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+    import graphics
+    from result_cache import render_cache
+
+    text = " ".join(SENTIMENT_CORPUS * 50)
+
+    def pyplot_render() -> str:
+        # The path words_plot used before: imshow, savefig, base64
+        wordcloud = WordCloud(stopwords=graphics.custom_stopwords, **graphics.WORDCLOUD_SETTINGS).generate(text)
+        img_buffer = io.BytesIO()
+        plt.imshow(wordcloud, interpolation="bilinear")
+        plt.axis("off")
+        plt.savefig(img_buffer, format="png", bbox_inches="tight", pad_inches=0)
+        plt.close()
+        return base64.b64encode(img_buffer.getvalue()).decode("utf-8")
+
+    def direct_render() -> str:
+        render_cache.clear()
+        return graphics.words_plot(text, image_format)
+
+    def timed(render) -> tuple:
+        start = time.perf_counter()
+        for _ in range(renders):
+            image = render()
+        return (time.perf_counter() - start) / renders * 1000, len(base64.b64decode(image))
+
+    report = {}
+    report["pyplot_ms"], report["pyplot_bytes"] = timed(pyplot_render)
+    report["direct_ms"], report["direct_bytes"] = timed(direct_render)
+    graphics.words_plot(text, image_format)
+    report["cached_ms"], _ = timed(lambda: graphics.words_plot(text, image_format))
+    print(
+        f"Word cloud: pyplot {report['pyplot_ms']:.0f} ms ({report['pyplot_bytes'] // 1024} KiB), "
+        f"direct {image_format} {report['direct_ms']:.0f} ms ({report['direct_bytes'] // 1024} KiB), cached {report['cached_ms']:.1f} ms"
+    )
+    return report
+
+
+def bench_kde(sizes=(1_000, 10_000, 100_000, 1_000_000), points: int = 500) -> Dict[int, Dict[str, float]]:
+    """
+    Compare the binned FFT density estimate with `scipy.stats.gaussian_kde` on bimodal sentiment-like scores.
+
+    Parameters:
+    sizes (tuple): Numbers of scores to time (default is 1k to 1M).
+    points (int): Evaluation points of each curve (default is 500).
+
+    Returns:
+    dict: Milliseconds of each method and the largest gap relative to the peak, per size.
+    """
+    import numpy as np
+    from scipy.stats import gaussian_kde
+    from graphics import binned_kde
+
+    rng = np.random.default_rng(0)
+    report = {}
+    for size in sizes:
+        scores = np.clip(np.concatenate([rng.normal(0.6, 0.2, size // 2), rng.normal(-0.7, 0.15, size - size // 2)]), -1, 1)
+
+        start = time.perf_counter()
+        x, binned = binned_kde(scores, points)
+        binned_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        exact = gaussian_kde(scores)(x)
+        exact_ms = (time.perf_counter() - start) * 1000
+
+        report[size] = {
+            "gaussian_kde_ms": exact_ms,
+            "binned_ms": binned_ms,
+            "max_relative_error": float(np.abs(binned - exact).max() / exact.max()),
+        }
+        print(f"KDE of {size} scores: gaussian_kde {exact_ms:.1f} ms, binned {binned_ms:.1f} ms, max error {report[size]['max_relative_error']:.1e} of peak")
+    return report
+
+
+if __name__ == "__main__":
+    bench_cold_start()
+    bench_sentiment_backends("text")
+    bench_sentiment_backends("news")
+    bench_keyword_extraction()
+    bench_wordcloud()
+    bench_kde()
+    if os.getenv("BENCH_TENANT"):
+        bench_bulk_update(os.getenv("BENCH_TENANT"))
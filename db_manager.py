@@ -1,16 +1,25 @@
+from collections import OrderedDict
+import io
 from contextlib import contextmanager, asynccontextmanager
+import threading
 import psycopg2
 from psycopg2 import sql
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
-from typing import Dict
-from sqlalchemy import create_engine, func, Table, text
+from typing import Dict, List
+from sqlalchemy import create_engine, event, func, literal, select, text, union_all
+from sqlalchemy.sql.expression import TableClause
 import os
+import pandas as pd
 
 load_dotenv()
 
+# "database": one login role (and default schema) per keyword, each with its own pool.
+# "schema": one shared pool, every session routed to "<keyword>_schema" on checkout.
+TENANCY_MODE = os.getenv("DB_TENANCY", "database")
+
 
 @asynccontextmanager
 async def async_no_autoflush(session: AsyncSession):
@@ -49,28 +58,128 @@ async def async_get_session(SessionLocalAsync: sessionmaker):
 def get_credentials() -> Dict[str, str]:
     return {
         'db_name' : os.getenv("DB_NAME"),
+        'user': os.getenv("DB_USER"),
         'password': os.getenv("DB_PASSWORD"),
         'host': os.getenv("DB_HOST", "localhost"),
         'port': os.getenv("DB_PORT", "5432")
     }
 
 
-def create_engine_and_sessions(user: str = None) -> Dict[str, Engine | sessionmaker]:
+def get_database_url(user: str, driver: str = "postgresql") -> str:
     """
-    Dynamically create engines and session factories for both sync and async usage.
-    If schema_name is not provided, it defaults to the value from environment variables.
+    Build the connection URL for the given database user.
+
+    Parameters:
+    user (str): The database user (tenant keyword).
+    driver (str): The SQLAlchemy driver prefix (default is 'postgresql').
+
+    Returns:
+    str: The connection URL.
     """
     credentials = get_credentials()
+    return f'{driver}://{user.lower()}:{credentials["password"]}@{credentials["host"]}:{credentials["port"]}/{credentials["db_name"]}'
 
-    user = user.lower()
-    DATABASE_URL = f'postgresql://{user}:{credentials["password"]}@{credentials["host"]}:{credentials["port"]}/{credentials["db_name"]}'
-    ASYNC_DATABASE_URL = f'postgresql+asyncpg://{user}:{credentials["password"]}@{credentials["host"]}:{credentials["port"]}/{credentials["db_name"]}'
 
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
+def tenant_schema(keyword: str) -> str:
+    """
+    Return the schema name holding the given tenant's tables in schema tenancy mode.
+
+    Parameters:
+    keyword (str): The tenant keyword.
+
+    Returns:
+    str: The tenant schema name.
+    """
+    return f"{keyword.lower()}_schema"
+
+
+def _route_tenant_schema(conn) -> None:
+    """
+    Point the connection's search_path at the tenant schema carried in its execution options.
+
+    Registered on the shared engines as a "begin" listener, so it runs each time a pooled
+    connection starts a transaction for a tenant, whichever tenant used it last.
+    """
+    schema = conn.get_execution_options().get("tenant_schema")
+    if schema is None:
+        return
+    quoted = conn.dialect.identifier_preparer.quote_identifier(schema)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SET search_path TO {quoted}, public")
+    finally:
+        cursor.close()
+
+
+_shared_engines: Dict[str, Engine] = {}
+_shared_engines_lock = threading.Lock()
+
+
+def get_shared_engines(pool_size: int = None, max_overflow: int = None) -> Dict[str, Engine]:
+    """
+    Return the process-wide sync and async engines connecting as DB_USER.
+
+    Schema tenancy mode draws every tenant from them, and the cross-tenant score cache uses
+    them in both modes. The engines are created once and route every transaction to the
+    tenant schema set through `execution_options(tenant_schema=...)`, if any.
+
+    Parameters:
+    pool_size (int): Pool size, defaults to DB_POOL_SIZE.
+    max_overflow (int): Pool overflow, defaults to DB_MAX_OVERFLOW.
+
+    Returns:
+    dict: A dictionary with the shared 'engine' and 'async_engine'.
+    """
+    with _shared_engines_lock:
+        if not _shared_engines:
+            pool_size = pool_size or int(os.getenv("DB_POOL_SIZE", "5"))
+            max_overflow = max_overflow if max_overflow is not None else int(os.getenv("DB_MAX_OVERFLOW", "10"))
+            user = get_credentials()["user"]
+
+            engine = create_engine(get_database_url(user), pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+            async_engine = create_async_engine(get_database_url(user, "postgresql+asyncpg"), pool_size=pool_size, max_overflow=max_overflow)
+            event.listen(engine, "begin", _route_tenant_schema)
+            event.listen(async_engine.sync_engine, "begin", _route_tenant_schema)
 
-    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+            _shared_engines['engine'] = engine
+            _shared_engines['async_engine'] = async_engine
+        return dict(_shared_engines)
+
+
+def dispose_shared_engines() -> None:
+    """
+    Close the shared engines' pooled connections and forget them.
+
+    Call before forking worker processes: a child must not reuse a socket inherited from its
+    parent, so each worker opens its own engines on first use instead.
+    """
+    with _shared_engines_lock:
+        engine = _shared_engines.pop('engine', None)
+        async_engine = _shared_engines.pop('async_engine', None)
+        if engine is not None:
+            engine.dispose()
+        if async_engine is not None:
+            # Closing asyncpg connections needs an event loop; dropping them is enough here
+            async_engine.sync_engine.dispose(close=False)
+
+
+def create_engine_and_sessions(user: str = None, pool_size: int = 5, max_overflow: int = 10) -> Dict[str, Engine | sessionmaker]:
+    """
+    Dynamically create engines and session factories for both sync and async usage.
+    If schema_name is not provided, it defaults to the value from environment variables.
+
+    In schema tenancy mode the returned engines are lightweight views over the shared
+    engines, so every tenant draws from the same connection pool.
+    """
+    if TENANCY_MODE == "schema":
+        shared = get_shared_engines()
+        engine = shared['engine'].execution_options(tenant_schema=tenant_schema(user))
+        async_engine = shared['async_engine'].execution_options(tenant_schema=tenant_schema(user))
+    else:
+        engine = create_engine(get_database_url(user), pool_size=pool_size, max_overflow=max_overflow)
+        async_engine = create_async_engine(get_database_url(user, "postgresql+asyncpg"), pool_size=pool_size, max_overflow=max_overflow)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     SessionLocalAsync = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
     return {
@@ -81,6 +190,122 @@ def create_engine_and_sessions(user: str = None) -> Dict[str, Engine | sessionma
     }
 
 
+class EngineRegistry:
+    """
+    Process-wide, thread-safe registry handing out one pooled sync engine and session factory per tenant.
+
+    Tenants are kept in least-recently-used order; once more than `max_tenants` are open, the
+    least recently used one is evicted and its engine disposed, closing its idle connections.
+    In schema tenancy mode every tenant is a view over the shared engine, so eviction only
+    forgets the view and the shared pool stays open.
+    """
+
+    def __init__(self, max_tenants: int = 8, pool_size: int = 5, max_overflow: int = 10):
+        self.max_tenants = max_tenants
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self._entries: OrderedDict[str, Dict[str, Engine | sessionmaker]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _build(self, keyword: str) -> Dict[str, Engine | sessionmaker]:
+        if TENANCY_MODE == "schema":
+            shared = get_shared_engines(self.pool_size, self.max_overflow)
+            engine = shared['engine'].execution_options(tenant_schema=tenant_schema(keyword))
+        else:
+            engine = create_engine(
+                get_database_url(keyword),
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_pre_ping=True,
+            )
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return {'engine': engine, 'SessionLocal': SessionLocal}
+
+    @staticmethod
+    def _dispose(entry: Dict[str, Engine | sessionmaker]) -> None:
+        if TENANCY_MODE != "schema":
+            entry['engine'].dispose()
+
+    def get(self, keyword: str) -> Dict[str, Engine | sessionmaker]:
+        """
+        Return the engine and session factory for the given tenant, creating them on first use.
+
+        Parameters:
+        keyword (str): The tenant keyword.
+
+        Returns:
+        dict: A dictionary with the tenant 'engine' and 'SessionLocal'.
+        """
+        key = keyword.lower()
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            entry = self._build(key)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_tenants:
+                _, old_entry = self._entries.popitem(last=False)
+                evicted.append(old_entry)
+                self.evictions += 1
+
+        # Dispose outside the lock so slow connection teardown never blocks other tenants
+        for old_entry in evicted:
+            self._dispose(old_entry)
+        return entry
+
+    def dispose(self, keyword: str) -> None:
+        """
+        Drop the given tenant from the registry and dispose its engine.
+
+        Parameters:
+        keyword (str): The tenant keyword.
+        """
+        with self._lock:
+            entry = self._entries.pop(keyword.lower(), None)
+        if entry is not None:
+            self._dispose(entry)
+
+    def clear(self) -> None:
+        """
+        Dispose every registered engine.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._dispose(entry)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the registry counters.
+
+        Returns:
+        dict: Open tenants plus hit, miss and eviction counts.
+        """
+        with self._lock:
+            return {
+                'tenants': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+engine_registry = EngineRegistry(
+    max_tenants=int(os.getenv("DB_MAX_TENANTS", "8")),
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+)
+
+
 def create_db(db_name: str):
     
     credentials = get_credentials()
@@ -106,6 +331,43 @@ def create_db(db_name: str):
             conn.close()
 
 
+def create_schema(keyword: str) -> None:
+    """
+    Create the tenant schema used in schema tenancy mode, if it does not exist yet.
+
+    Parameters:
+    keyword (str): The tenant keyword.
+    """
+    engine = get_shared_engines()['engine']
+    schema = engine.dialect.identifier_preparer.quote_identifier(tenant_schema(keyword))
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    print(f"Schema '{tenant_schema(keyword)}' ready!")
+
+
+def _date_field(model, date_column: str):
+    return model.c[date_column] if isinstance(model, TableClause) else getattr(model, date_column)
+
+
+def _closest_date(session, date_field, target):
+    """
+    Return the stored date closest to the target date, or None if the table is empty.
+
+    The nearest date on each side is found with an index-friendly `<=`/`>=` LIMIT 1 probe,
+    and only those two candidates are compared, so no full scan or sort is needed.
+    """
+    target = literal(target, type_=date_field.type)
+    before = select(date_field.label("candidate")).where(date_field <= target).order_by(date_field.desc()).limit(1)
+    after = select(date_field.label("candidate")).where(date_field >= target).order_by(date_field.asc()).limit(1)
+    candidates = union_all(before, after).subquery()
+
+    return session.execute(
+        select(candidates.c.candidate).order_by(
+            func.abs(func.extract('epoch', candidates.c.candidate - target))
+        ).limit(1)
+    ).scalar()
+
+
 def filter_data_by_date(session, model, start_date, end_date, date_column='date'):
     """
     Filter data based on date range and return the filtered result.
@@ -121,7 +383,7 @@ def filter_data_by_date(session, model, start_date, end_date, date_column='date'
     list: A list of filtered data entries from the specified model.
     """
     # Perform initial query with date range filter
-    date_field = model.c[date_column] if isinstance(model, Table) else getattr(model, date_column)
+    date_field = _date_field(model, date_column)
     filtered_query = session.query(model).filter(
         date_field >= start_date,
         date_field <= end_date
@@ -130,12 +392,8 @@ def filter_data_by_date(session, model, start_date, end_date, date_column='date'
 
     # If no data found, find closest matching dates
     if not filtered_data:
-        closest_start = session.query(date_field).order_by(
-            func.abs(func.extract('epoch', date_field - start_date))
-        ).first()[0]
-        closest_end = session.query(date_field).order_by(
-            func.abs(func.extract('epoch', date_field - end_date))
-        ).first()[0]
+        closest_start = _closest_date(session, date_field, start_date)
+        closest_end = _closest_date(session, date_field, end_date)
 
         # Query again using the closest available dates
         filtered_data = session.query(model).filter(
@@ -146,6 +404,152 @@ def filter_data_by_date(session, model, start_date, end_date, date_column='date'
     return filtered_data
 
 
+def filter_columns_by_date(session, model, columns: List[str], start_date, end_date, date_column='date') -> pd.DataFrame:
+    """
+    Filter data based on date range and return only the requested columns as a DataFrame.
+
+    Unlike `filter_data_by_date`, rows are fetched as plain tuples: no ORM objects are built,
+    nothing enters the identity map and no relationships are loaded.
+
+    Parameters:
+    session: SQLAlchemy session to execute the query.
+    model: The SQLAlchemy model or Table to filter.
+    columns (List[str]): The names of the columns to return.
+    start_date (str): The start date for filtering data.
+    end_date (str): The end date for filtering data.
+    date_column (str): The name of the date column to filter by (default is 'date').
+
+    Returns:
+    pd.DataFrame: The filtered rows ordered by date, one column per requested name.
+    """
+    date_field = _date_field(model, date_column)
+    fields = [_date_field(model, column) for column in columns]
+
+    def fetch(start, end) -> pd.DataFrame:
+        result = session.execute(
+            select(*fields)
+            .where(date_field >= start, date_field <= end)
+            .order_by(date_field)
+        )
+        return pd.DataFrame.from_records(result.fetchall(), columns=columns)
+
+    filtered_data = fetch(start_date, end_date)
+
+    # If no data found, fall back to the closest matching dates
+    if filtered_data.empty:
+        closest_start = _closest_date(session, date_field, start_date)
+        closest_end = _closest_date(session, date_field, end_date)
+        if closest_start is not None:
+            filtered_data = fetch(closest_start, closest_end)
+
+    return filtered_data
+
+
+STREAM_CHUNK_SIZE = int(os.getenv("DB_STREAM_CHUNK_SIZE", "5000"))
+
+
+def stream_rows(engine: Engine, statement, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Run a SELECT through a server-side cursor and yield its rows in fixed-size chunks.
+
+    The cursor lives on its own connection, so the caller can write and commit each chunk
+    through a session without closing the cursor. Only `chunk_size` rows are held in memory
+    at a time.
+
+    Parameters:
+    engine (Engine): The engine of the tenant to read from.
+    statement: The SQLAlchemy select statement to run.
+    chunk_size (int): Number of rows fetched from the server per chunk (default is 5000).
+
+    Yields:
+    List[Row]: The next chunk of rows.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(statement)
+        for chunk in result.partitions():
+            yield chunk
+
+
+BULK_WRITE_CHUNK_SIZE = int(os.getenv("DB_BULK_WRITE_CHUNK_SIZE", "50000"))
+
+
+def _csv_field(value) -> str:
+    """
+    Encode one value for COPY ... (FORMAT csv): None becomes an unquoted empty field, which COPY
+    reads as NULL, while strings are always quoted so an empty string stays an empty string.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _copy_update(session, table_name: str, columns: List[str], rows: List[dict], key: str) -> None:
+    """
+    Load rows into a temporary table with COPY and apply them with one UPDATE ... FROM.
+    """
+    fields = [key] + columns
+    buffer = io.StringIO("".join(",".join(_csv_field(row[field]) for field in fields) + "\n" for row in rows))
+
+    staging = sql.Identifier(f"_bulk_{table_name}")
+    target = sql.Identifier(table_name)
+    field_list = sql.SQL(", ").join(sql.Identifier(field) for field in fields)
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        # Same column types as the target; dropped when the chunk commits
+        cursor.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+            staging, field_list, target
+        ))
+        cursor.copy_expert(
+            sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(staging, field_list).as_string(cursor),
+            buffer,
+        )
+        cursor.execute(sql.SQL("UPDATE {target} SET {assignments} FROM {staging} WHERE {target}.{key} = {staging}.{key}").format(
+            target=target,
+            staging=staging,
+            key=sql.Identifier(key),
+            assignments=sql.SQL(", ").join(
+                sql.SQL("{} = {}.{}").format(sql.Identifier(column), staging, sql.Identifier(column)) for column in columns
+            ),
+        ))
+    finally:
+        cursor.close()
+
+
+def bulk_update(session, model, rows: List[dict], key: str = "id", chunk_size: int = BULK_WRITE_CHUNK_SIZE) -> int:
+    """
+    Update many rows by primary key, committing every `chunk_size` rows.
+
+    On PostgreSQL each chunk is streamed into a temporary table with COPY and applied with a
+    single UPDATE ... FROM, instead of one UPDATE statement per row. Other databases fall back
+    to `bulk_update_mappings`.
+
+    Parameters:
+    session: SQLAlchemy session to write through.
+    model: The SQLAlchemy model to update.
+    rows (List[dict]): One mapping per row, holding the key and the columns to set.
+    key (str): The column identifying each row (default is 'id').
+    chunk_size (int): Number of rows applied and committed per transaction (default is 50000).
+
+    Returns:
+    int: The number of rows written.
+    """
+    if not rows:
+        return 0
+    columns = [column for column in rows[0] if column != key]
+    use_copy = session.get_bind().dialect.name == "postgresql"
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if use_copy:
+            _copy_update(session, model.__tablename__, columns, chunk, key)
+        else:
+            session.bulk_update_mappings(model, chunk)
+        session.commit()
+    return len(rows)
+
+
 def set_schema(session, schema_name: str):
     """
     Set the schema for the current database session.
@@ -158,4 +562,5 @@ def set_schema(session, schema_name: str):
     schema_name (str): The name of the schema to set as the search path.
 
     """
-    session.execute(text(f"SET search_path TO {schema_name}_schema;"))
\ No newline at end of file
+    schema = session.bind.dialect.identifier_preparer.quote_identifier(tenant_schema(schema_name))
+    session.execute(text(f"SET search_path TO {schema};"))
\ No newline at end of file
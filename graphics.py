@@ -1,25 +1,86 @@
 import base64
+import hashlib
 import io
+import os
+from typing import Dict
 
-import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
 import plotly.express as px
 from plotly.subplots import make_subplots
-from scipy.stats import gaussian_kde
 from sqlalchemy import text
-from wordcloud import STOPWORDS, WordCloud
-import talib as ta
+from wordcloud import WordCloud
+from result_cache import render_cache
+from word_counts import count_words, custom_stopwords
 
-matplotlib.use('TkAgg')
-
-custom_stopwords = set(STOPWORDS)
-custom_stopwords.update(["anything", "anyone"])
 pio.renderers.default = "browser"
 
+# "png" or "webp"; WebP images are several times smaller for the same word cloud
+WORDCLOUD_FORMAT = os.getenv("WORDCLOUD_FORMAT", "png")
+WORDCLOUD_SETTINGS = {
+    "background_color": "black",
+    "font_path": "fonts/ARIAL.ttf",
+    "width": 600,
+    "height": 400,
+    "max_words": 50,
+}
+
+
+def _records_frame(records, columns: dict) -> pd.DataFrame:
+    """
+    Build a DataFrame from either a projected DataFrame or a list of query rows.
+
+    Parameters:
+    records: A DataFrame from `filter_columns_by_date` or a list of SQLAlchemy rows.
+    columns (dict): Mapping of source column/attribute name to output column name.
+
+    Returns:
+    pd.DataFrame: A DataFrame holding only the mapped columns.
+    """
+    if isinstance(records, pd.DataFrame):
+        return records[list(columns)].rename(columns=columns)
+    return pd.DataFrame(
+        [{name: getattr(row, attr) for attr, name in columns.items()} for row in records],
+        columns=list(columns.values())
+    )
+
+def _daily_sentiment(records, prefix: str) -> pd.DataFrame:
+    df = _records_frame(records, {'date': 'date', 'sentiment_score': 'sentiment_score'})
+    days = pd.to_datetime(df['date']).dt.tz_localize(None).dt.normalize().rename('date')
+    daily = df['sentiment_score'].groupby(days).agg(['mean', 'count'])
+    return daily.rename(columns={'mean': f'{prefix}_sentiment', 'count': f'{prefix}_count'})
+
+
+def daily_frame(filtered_stocks, filtered_news, filtered_posts) -> pd.DataFrame:
+    """
+    Align prices and sentiment on one row per calendar day.
+
+    Closing prices are forward-filled over non-trading days inside the stock range; days
+    outside it keep their sentiment with no price.
+
+    Parameters:
+    filtered_stocks (list | pd.DataFrame): Stock rows with 'Date' and 'Close'.
+    filtered_news (list | pd.DataFrame): News rows with 'date' and 'sentiment_score'.
+    filtered_posts (list | pd.DataFrame): Post rows with 'date' and 'sentiment_score'.
+
+    Returns:
+    pd.DataFrame: Indexed by day, with close, price_change (%), news_sentiment, news_count,
+    post_sentiment and post_count (mean score and number of scored rows of the day).
+    """
+    stock_df = _records_frame(filtered_stocks, {'Date': 'date', 'Close': 'close'})
+    stock_df['date'] = pd.to_datetime(stock_df['date']).dt.tz_localize(None).dt.normalize()
+    stock_df = stock_df.drop_duplicates(subset='date').set_index('date').sort_index()
+    stock_df = stock_df.asfreq('D').ffill()
+    stock_df['price_change'] = stock_df['close'].pct_change() * 100
+
+    frame = stock_df.join(_daily_sentiment(filtered_news, 'news'), how='outer')
+    frame = frame.join(_daily_sentiment(filtered_posts, 'post'), how='outer')
+    frame[['news_count', 'post_count']] = frame[['news_count', 'post_count']].fillna(0).astype(int)
+    return frame
+
+
 def stocks_plot(engine, date_start: str, date_end: str, name:str) -> go.Figure:
     """
     Generate a stock price plot with indicators such as SMA, Bollinger Bands, and MACD.
@@ -34,25 +95,20 @@ def stocks_plot(engine, date_start: str, date_end: str, name:str) -> go.Figure:
     plotly.graph_objs.Figure: The generated stock price figure.
     """
     query = """
-        SELECT "Date", "Open", "High", "Low", "Close", "Volume"
+        SELECT "Date", "Open", "High", "Low", "Close", "Volume",
+               "SMA", "BB_High", "BB_Mid", "BB_Low", "MACD", "MACD_Signal", "MACD_Hist"
         FROM stocks
+        WHERE "Date" >= :date_start AND "Date" <= :date_end
+        ORDER BY "Date"
     """
 
-    # Fetch stock data from the database
+    # Fetch only the requested range; indicators are precomputed at ingest by stocks.inject_stock
     with engine.connect() as conn:
-        df = pd.read_sql_query(text(query), conn)
+        df = pd.read_sql_query(text(query), conn, params={"date_start": date_start, "date_end": date_end})
     
     # Process data for plotting
     df["Date"] = pd.to_datetime(df["Date"], utc=True)
     df.set_index("Date", inplace=True)
-    df["SMA"] = ta.SMA(df["Close"], timeperiod=20)  # Simple Moving Average
-    df["BB_High"], df["BB_Mid"], df["BB_Low"] = ta.BBANDS(df["Close"], timeperiod=20, nbdevup=2, nbdevdn=2, matype=0)  # Bollinger Bands
-
-    # Calculate MACD
-    df["MACD"], df["MACD_Signal"], df["MACD_Hist"] = ta.MACD(df["Close"], fastperiod=12, slowperiod=26, signalperiod=9)
-
-    # Filter data for the specified date range
-    df = df[(df.index >= date_start) & (df.index <= date_end)]
 
     # Create subplots for the stock data and MACD
     fig = make_subplots(
@@ -107,53 +163,130 @@ def stocks_plot(engine, date_start: str, date_end: str, name:str) -> go.Figure:
 
     return fig
 
-def words_plot(data: str) -> str:
+def wordcloud_key(frequencies: Dict[str, float], image_format: str = WORDCLOUD_FORMAT) -> tuple:
+    """
+    Build the content-addressed cache key of a word cloud: the same frequencies and settings give the same key.
+
+    Parameters:
+    frequencies (Dict[str, float]): Term frequencies the cloud is drawn from.
+    image_format (str): "png" or "webp".
+
+    Returns:
+    tuple: The render cache key.
+    """
+    content = repr((sorted(frequencies.items()), sorted(WORDCLOUD_SETTINGS.items()), image_format.lower()))
+    return ("wordcloud", hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+
+def render_wordcloud(frequencies: Dict[str, float], image_format: str = WORDCLOUD_FORMAT) -> bytes:
+    """
+    Draw a word cloud from term frequencies and encode it, without going through pyplot.
+
+    Renders are cached by content, so a cloud is laid out only once for a given input.
+
+    Parameters:
+    frequencies (Dict[str, float]): Term frequencies the cloud is drawn from.
+    image_format (str): "png" or "webp".
+
+    Returns:
+    bytes: The encoded image.
+    """
+    key = wordcloud_key(frequencies, image_format)
+    image = render_cache.get(key)
+    if image is None:
+        wordcloud = WordCloud(stopwords=custom_stopwords, **WORDCLOUD_SETTINGS).generate_from_frequencies(frequencies)
+        img_buffer = io.BytesIO()
+        wordcloud.to_image().save(img_buffer, format=image_format.upper())
+        image = img_buffer.getvalue()
+        render_cache.set(key, image)
+    return image
+
+
+def words_plot(data: str, image_format: str = WORDCLOUD_FORMAT) -> str:
     """
     Generate a word cloud from the given text data.
 
     Parameters:
     data (str): Text data to generate the word cloud from.
+    image_format (str): "png" or "webp" (default is WORDCLOUD_FORMAT).
 
     Returns:
     str: Base64 encoded image of the generated word cloud.
     """
-    font_path = "fonts/ARIAL.ttf"
-    wordcloud = WordCloud(
-        stopwords=custom_stopwords,
-        background_color="black",
-        font_path=font_path,
-        width=600,
-        height=400,
-        max_words=50,
-    ).generate(data)
-
-    # Convert word cloud image to base64 string
-    img_buffer = io.BytesIO()
-    plt.imshow(wordcloud, interpolation="bilinear")
-    plt.axis("off")
-    plt.savefig(img_buffer, format="png", bbox_inches='tight', pad_inches=0)
-    plt.close()
-    img_buffer.seek(0)
-    img_formatted = base64.b64encode(img_buffer.read()).decode("utf-8")
-    
-    return img_formatted
+    # Counting words is cheap next to laying the cloud out, and gives the cache its key
+    return frequencies_plot(count_words(data), image_format)
+
+
+def frequencies_plot(frequencies: Dict[str, float], image_format: str = WORDCLOUD_FORMAT) -> str:
+    """
+    Generate a word cloud from precomputed word counts.
+
+    Parameters:
+    frequencies (Dict[str, float]): Word counts, e.g. merged from the daily counts of a range.
+    image_format (str): "png" or "webp" (default is WORDCLOUD_FORMAT).
+
+    Returns:
+    str: Base64 encoded image of the generated word cloud.
+    """
+    return base64.b64encode(render_wordcloud(frequencies, image_format)).decode("utf-8")
+
+
+def binned_kde(values, points: int = 500, bins: int = 4096) -> tuple:
+    """
+    Gaussian kernel density estimate of 1-D values, computed on a grid by linear binning and FFT convolution.
+
+    Uses Scott's bandwidth like `scipy.stats.gaussian_kde`, but costs O(n + bins log bins)
+    instead of O(n * points), so it stays fast for hundreds of thousands of scores.
+
+    Parameters:
+    values (array-like): The values to estimate the density of.
+    points (int): Number of evaluation points between the smallest and largest value (default is 500).
+    bins (int): Size of the internal binning grid (default is 4096).
+
+    Raises:
+    ValueError: If there are fewer than two distinct values.
+
+    Returns:
+    tuple: The evaluation points and the density at each of them.
+    """
+    values = np.asarray(values, dtype=float)
+    low, high = values.min(initial=np.inf), values.max(initial=-np.inf)
+    if values.size < 2 or not high > low:
+        raise ValueError("A density needs at least two distinct values.")
+    bandwidth = values.std(ddof=1) * values.size ** (-1 / 5)
+
+    # Linear binning: each value splits its weight between the two nearest grid nodes
+    step = (high - low) / (bins - 1)
+    position = (values - low) / step
+    left = np.minimum(position.astype(int), bins - 2)
+    right_weight = position - left
+    counts = np.bincount(left, 1 - right_weight, minlength=bins) + np.bincount(left + 1, right_weight, minlength=bins)
+
+    # Kernel sampled on the grid out to 5 bandwidths, then one FFT convolution
+    reach = min(int(np.ceil(5 * bandwidth / step)), bins - 1)
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = 1 << int(np.ceil(np.log2(bins + 2 * reach)))
+    density = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)[reach:reach + bins] / values.size
+
+    grid = low + np.arange(bins) * step
+    x = np.linspace(low, high, points)
+    return x, np.maximum(np.interp(x, grid, density), 0)
+
 
 def sentiment_boxplot(query_result, title: str, color: str) -> go.Figure:
     """
     Plots a boxplot for sentiment scores from the given query result.
 
     Parameters:
-    query_result (list): The SQLAlchemy query result containing date and sentiment_score.
+    query_result (list | pd.DataFrame): The query result containing date and sentiment_score.
     title (str): The title of the boxplot.
     color (str): Color to be used for the boxplot.
 
     Returns:
     plotly.graph_objs._figure.Figure: The generated boxplot figure.
     """
-    df = pd.DataFrame([{
-        'date': row.date,
-        'sentiment_score': row.sentiment_score
-    } for row in query_result])
+    df = _records_frame(query_result, {'date': 'date', 'sentiment_score': 'sentiment_score'})
 
     df = df[(df["sentiment_score"] < -0.5) | (df["sentiment_score"] > 0.5)]
 
@@ -186,8 +319,8 @@ def combined_sentiment_histogram_area_plot(news_result, post_result, news_title:
     Plots an interactive density line plot for sentiment scores from news and post query results.
 
     Parameters:
-    news_result (list): The SQLAlchemy query result for news containing date and sentiment_score.
-    post_result (list): The SQLAlchemy query result for posts containing date and sentiment_score.
+    news_result (list | pd.DataFrame): The query result for news containing sentiment_score.
+    post_result (list | pd.DataFrame): The query result for posts containing sentiment_score.
     news_title (str): The title of the density plot for news.
     post_title (str): The title of the density plot for posts.
     news_color (str): Color to be used for the news density line.
@@ -197,16 +330,11 @@ def combined_sentiment_histogram_area_plot(news_result, post_result, news_title:
     plotly.graph_objs._figure.Figure: The generated density line plot figure.
     """
     
-    news_scores = [row.sentiment_score for row in news_result]
-    post_scores = [row.sentiment_score for row in post_result]
-
-    news_kde = gaussian_kde(news_scores)
-    news_x = np.linspace(min(news_scores), max(news_scores), 500)
-    news_y = news_kde(news_x)
+    news_scores = _records_frame(news_result, {'sentiment_score': 'sentiment_score'})['sentiment_score'].dropna().to_numpy()
+    post_scores = _records_frame(post_result, {'sentiment_score': 'sentiment_score'})['sentiment_score'].dropna().to_numpy()
 
-    post_kde = gaussian_kde(post_scores)
-    post_x = np.linspace(min(post_scores), max(post_scores), 500)
-    post_y = post_kde(post_x)
+    news_x, news_y = binned_kde(news_scores)
+    post_x, post_y = binned_kde(post_scores)
 
     fig = go.Figure()
 
@@ -251,68 +379,69 @@ def combined_sentiment_histogram_area_plot(news_result, post_result, news_title:
 
     return fig
 
-def density_3d_plot(filtered_stocks, filtered_news, filtered_posts) -> go.Figure:
+def binned_surface(x, y, z, grid: int = 50, smoothing: float = None, min_weight: float = 0.1) -> tuple:
     """
-    Creates a 3D surface plot showing the relationship between stock price change percentage and sentiment scores (both news and posts).
+    Mean of z over a regular (x, y) grid, smoothed with a normalized Gaussian filter.
+
+    Points are first binned into `grid` x `grid` cells holding the sum of z and the number of
+    points, so the cost after binning does not depend on how many points there are. Both grids
+    are then blurred and divided, giving a kernel-weighted mean of z around each cell.
 
     Parameters:
-    filtered_stocks (list): The SQLAlchemy query result containing stock data with 'Date' and 'Close' columns.
-    filtered_news (list): The SQLAlchemy query result containing news sentiment scores.
-    filtered_posts (list): The SQLAlchemy query result containing post sentiment scores.
+    x, y, z (array-like): The point coordinates and the value to average.
+    grid (int): Number of cells along each axis (default is 50).
+    smoothing (float): Standard deviation of the Gaussian filter, in cells. By default it widens as points
+    get sparser (grid / sqrt(n), at least 1.5 cells), so a few months of daily points still form a surface.
+    min_weight (float): Cells whose smoothed point count is below this fraction of a single point's
+    peak are left empty, i.e. cells about two filter widths away from any point (default is 0.1).
+
+    Raises:
+    ValueError: If there are no points.
 
     Returns:
-    plotly.graph_objs._figure.Figure: The generated 3D surface plot.
+    tuple: Cell centers along x and y, the surface (rows follow y) and the raw counts per cell.
     """
-    # Convert filtered query results to DataFrames
-    stock_df = pd.DataFrame([{
-        'date': row.Date,
-        'close': row.Close
-    } for row in filtered_stocks]).drop_duplicates()
-
-    news_df = pd.DataFrame([{
-        'date': row.date,
-        'sentiment_score': row.sentiment_score
-    } for row in filtered_news]).drop_duplicates()
-
-    posts_df = pd.DataFrame([{
-        'date': row.date,
-        'sentiment_score': row.sentiment_score
-    } for row in filtered_posts]).drop_duplicates()
-
-    # Convert dates to datetime and normalize to remove time component
-    stock_df['date'] = pd.to_datetime(stock_df['date']).dt.tz_localize(None).dt.normalize()
-    news_df['date'] = pd.to_datetime(news_df['date']).dt.tz_localize(None).dt.normalize()
-    posts_df['date'] = pd.to_datetime(posts_df['date']).dt.tz_localize(None).dt.normalize()
+    from scipy.ndimage import gaussian_filter
 
-    # Remove duplicates and set date as index for stock data
-    stock_df = stock_df.drop_duplicates(subset='date')
-    news_df = news_df.drop_duplicates(subset='date')
-    posts_df = posts_df.drop_duplicates(subset='date')
+    x, y, z = (np.asarray(values, dtype=float) for values in (x, y, z))
+    if not x.size:
+        raise ValueError("A surface needs at least one point.")
 
-    stock_df.set_index('date', inplace=True)
-    stock_df = stock_df.asfreq('D').ffill()
+    if smoothing is None:
+        smoothing = max(1.5, grid / np.sqrt(x.size))
 
-    # Calculate daily percentage change in stock price
-    stock_df['price_change'] = stock_df['close'].pct_change() * 100
-    stock_df.dropna(subset=['price_change'], inplace=True)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=grid)
+    sums, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=z)
 
-    # Merge stock and sentiment data on the date
-    merged_data = pd.merge(stock_df.reset_index(), news_df, on='date', how='inner')
-    merged_data = pd.merge(merged_data, posts_df, on='date', how='inner').dropna()
+    weight = gaussian_filter(counts, smoothing, mode='constant')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        surface = gaussian_filter(sums, smoothing, mode='constant') / weight
+    surface[weight < min_weight / (2 * np.pi * smoothing ** 2)] = np.nan
 
-    # Prepare data for 3D plot
-    x = merged_data['sentiment_score_x']  # News sentiment score
-    y = merged_data['sentiment_score_y']  # Posts sentiment score
-    z = merged_data['price_change']       # Price change percentage
+    # histogram2d indexes cells as [x, y]; plotly surfaces expect rows along y
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, surface.T, counts.T
+
+
+def density_3d_plot(daily: pd.DataFrame) -> go.Figure:
+    """
+    Creates a 3D surface plot showing the relationship between stock price change percentage and sentiment scores (both news and posts).
 
-    # Create a regular grid for 3D plotting
-    x_linspace = np.linspace(x.min(), x.max(), 50)
-    y_linspace = np.linspace(y.min(), y.max(), 50)
-    x_grid, y_grid = np.meshgrid(x_linspace, y_linspace)
+    Parameters:
+    daily (pd.DataFrame): The aligned daily frame from `daily_frame`.
+
+    Returns:
+    plotly.graph_objs._figure.Figure: The generated 3D surface plot.
+    """
+    # Days with a price change and both kinds of sentiment
+    merged_data = daily[['news_sentiment', 'post_sentiment', 'price_change']].dropna()
 
-    # Interpolate z values on the grid
-    from scipy.interpolate import griddata
-    z_grid = griddata((x, y), z, (x_grid, y_grid), method='cubic')
+    # Prepare data for 3D plot
+    x = merged_data['news_sentiment']  # News sentiment score
+    y = merged_data['post_sentiment']  # Posts sentiment score
+    z = merged_data['price_change']    # Price change percentage
+
+    # Mean price change per (news, post) cell, smoothed; bounded cost however long the range
+    x_grid, y_grid, z_grid, _ = binned_surface(x, y, z)
 
     # Create 3D surface plot
     fig = go.Figure(data=[go.Surface(
@@ -346,81 +475,38 @@ def density_3d_plot(filtered_stocks, filtered_news, filtered_posts) -> go.Figure
 
     return fig
 
-def chord_correlation_plot(filtered_stocks, filtered_news, filtered_posts) -> go.Figure:
+def chord_correlation_plot(daily: pd.DataFrame) -> go.Figure:
     """
     Creates a chord diagram showing the relationship between sentiment categories (positive, negative, neutral) from both news and posts, and stock price change (increase, decrease, stable).
 
     Parameters:
-    filtered_stocks (list): The SQLAlchemy query result containing stock data with 'Date' and 'Close' columns.
-    filtered_news (list): The SQLAlchemy query result containing news sentiment scores.
-    filtered_posts (list): The SQLAlchemy query result containing post sentiment scores.
+    daily (pd.DataFrame): The aligned daily frame from `daily_frame`.
 
     Returns:
     plotly.graph_objs._figure.Figure: The generated chord diagram plot.
     """
-    # Convert filtered query results to DataFrames
-    stock_df = pd.DataFrame([{
-        'date': row.Date,
-        'close': row.Close
-    } for row in filtered_stocks]).drop_duplicates()
-
-    news_df = pd.DataFrame([{
-        'date': row.date,
-        'sentiment_score': row.sentiment_score
-    } for row in filtered_news]).drop_duplicates()
-
-    posts_df = pd.DataFrame([{
-        'date': row.date,
-        'sentiment_score': row.sentiment_score
-    } for row in filtered_posts]).drop_duplicates()
-
-    # Convert dates to datetime and normalize to remove time component
-    stock_df['date'] = pd.to_datetime(stock_df['date']).dt.tz_localize(None).dt.normalize()
-    news_df['date'] = pd.to_datetime(news_df['date']).dt.tz_localize(None).dt.normalize()
-    posts_df['date'] = pd.to_datetime(posts_df['date']).dt.tz_localize(None).dt.normalize()
-
-    stock_df = stock_df.drop_duplicates(subset='date')
-    news_df = news_df.drop_duplicates(subset='date')
-    posts_df = posts_df.drop_duplicates(subset='date')
-
-    stock_df.set_index('date', inplace=True)
-    stock_df = stock_df.asfreq('D').ffill()
+    # Only days inside the stock range; the first one has no change and counts as stable
+    stock_days = daily[daily['close'].notna()]
+    categories = ['Increase', 'Decrease', 'Stable']
+    price_category = np.select(
+        [stock_days['price_change'] > 0, stock_days['price_change'] < 0],
+        categories[:2],
+        default='Stable'
+    )
 
-    # Calculate daily percentage change in stock price
-    stock_df['price_change'] = stock_df['close'].pct_change() * 100
+    def sentiment_category(column: str, name: str) -> pd.DataFrame:
+        scored = stock_days[column].notna().to_numpy()
+        score = stock_days[column].to_numpy()[scored]
+        return pd.DataFrame({
+            'sentiment_category': np.select([score > 0, score < 0], [f'{name} Positive', f'{name} Negative'], default=f'{name} Neutral'),
+            'price_category': price_category[scored],
+        })
 
-    # Categorize price changes
-    conditions = [
-        (stock_df['price_change'] > 0),
-        (stock_df['price_change'] < 0),
-        (stock_df['price_change'] == 0)
-    ]
-    categories = ['Increase', 'Decrease', 'Stable']
-    stock_df['price_category'] = np.select(conditions, categories, default='Stable')
-
-    # Categorize sentiment scores for news and posts
-    sentiment_conditions_news = [
-        (news_df['sentiment_score'] > 0),
-        (news_df['sentiment_score'] < 0),
-        (news_df['sentiment_score'] == 0)
-    ]
     sentiment_categories_news = ['News Positive', 'News Negative', 'News Neutral']
-    news_df['sentiment_category'] = np.select(sentiment_conditions_news, sentiment_categories_news, default='News Neutral')
-
-    sentiment_conditions_posts = [
-        (posts_df['sentiment_score'] > 0),
-        (posts_df['sentiment_score'] < 0),
-        (posts_df['sentiment_score'] == 0)
-    ]
     sentiment_categories_posts = ['Posts Positive', 'Posts Negative', 'Posts Neutral']
-    posts_df['sentiment_category'] = np.select(sentiment_conditions_posts, sentiment_categories_posts, default='Posts Neutral')
-
-    combined_news = pd.merge(stock_df.reset_index(), news_df, on='date', how='inner')
-    combined_posts = pd.merge(stock_df.reset_index(), posts_df, on='date', how='inner')
-    combined_df = pd.concat([combined_news, combined_posts], axis=0)
+    combined_df = pd.concat([sentiment_category('news_sentiment', 'News'), sentiment_category('post_sentiment', 'Posts')], axis=0)
 
     # Relationship count between sentiment and price categories
-    combined_df = combined_df[['sentiment_category', 'price_category']]
     relationship_counts = combined_df.groupby(['sentiment_category', 'price_category']).size().unstack(fill_value=0)
 
     relationship_counts_percent = relationship_counts.apply(lambda x: (x / x.sum()) * 100, axis=1)
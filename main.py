@@ -1,154 +1,223 @@
 from dash import Dash, html, dcc, callback, Output, Input
 import dash_bootstrap_components as dbc
-import graphics
 import datetime as dt
 from dateutil.relativedelta import relativedelta
-from db_manager import create_engine_and_sessions, filter_data_by_date
-from sqlalchemy import MetaData, Table, func
-from models import RedditPost, News
-import matplotlib
+from db_manager import engine_registry, filter_columns_by_date
+from sqlalchemy import func, select
+from models import DailyWordCount, DataVersion, RedditPost, News, Stock
+from result_cache import dataset_cache, sentiment_cache
 import json
+import threading
+from typing import Callable
 
-matplotlib.use("Agg")
+# graphics (scipy, wordcloud, plotly) is imported inside the callbacks that need it,
+# and nothing touches the database until the first request, so the app boots fast and even
+# while the database is unreachable.
 
-# Load stock data from JSON and set up database connection
+# Load stock data from JSON
 with open("stocks_data.json", "r") as f:
     stocks_data = json.load(f)
 stock_options = [{"label": stock["name"], "value": stock["nickname"]} for stock in stocks_data]
 DEFAULT_KEYWORD = stock_options[0]["value"]
-db_info = create_engine_and_sessions(DEFAULT_KEYWORD)
-metadata = MetaData()
-session = db_info["SessionLocal"]()
-stocks_table = Table("stocks", metadata, autoload_with=session.bind)
 app = Dash(__name__)
 
-# Define app layout
-app.layout = html.Div([
-    html.Div([
+
+def serve_layout() -> html.Div:
+    """
+    Build the app layout for each page load.
+
+    The date pickers start without bounds; `update_date_bounds` fills them in per tenant.
+
+    Returns:
+    html.Div: The app layout.
+    """
+    return html.Div([
         html.Div([
-            html.H1(id="main_title", className="main_title"),
-            dcc.Dropdown(
-                id="search_selector",
-                options=stock_options,
-                placeholder=stock_options[0]["label"],
-                searchable=True,
-                clearable=False,
-            ),
             html.Div([
-                dcc.DatePickerRange(
-                id="date_picker_stocks",
-                min_date_allowed=session.query(func.min(stocks_table.c.Date)).scalar(),
-                max_date_allowed=session.query(func.max(stocks_table.c.Date)).scalar(),
-                initial_visible_month=dt.datetime.today() - relativedelta(months=6),
-                start_date= dt.datetime.today() - relativedelta(months=6),
-                end_date = dt.datetime.today()
+                html.H1(id="main_title", className="main_title"),
+                dcc.Dropdown(
+                    id="search_selector",
+                    options=stock_options,
+                    placeholder=stock_options[0]["label"],
+                    searchable=True,
+                    clearable=False,
                 ),
-            ], className="date_picker_up"),
-        ], className="main_bar row bg_dark"),
+                html.Div([
+                    dcc.DatePickerRange(
+                    id="date_picker_stocks",
+                    initial_visible_month=dt.datetime.today() - relativedelta(months=6),
+                    start_date= dt.datetime.today() - relativedelta(months=6),
+                    end_date = dt.datetime.today()
+                    ),
+                ], className="date_picker_up"),
+            ], className="main_bar row bg_dark"),
+            html.Div([
+                dcc.Loading(
+                    children=[
+                        dcc.Graph(id="stocks_graph", config={"responsive": True}, className="stocks_graph")
+                    ],
+                    type="default"
+                )
+            ], className="stocks_graph_container")
+        ], className="container_up bg_dark"),
+    
+        html.Div([
+            html.Div([
+                dcc.Loading(
+                    children=[
+                        html.Img(id="wordcloud_news", className="wordcloud", style={"height": "280px", "width": "450px"})
+                    ],
+                    type="default"
+                )
+            ], className="container column words_div bg_dark"),
+            html.Div([
+                dcc.Loading(children=[
+                    html.Div(id="sentiment_news"),
+                    ], 
+                    type="default"
+                ),
+                html.Div([
+                    html.Div([
+                        dcc.DatePickerRange(
+                            id="date_picker_sentiments",
+                            start_date= dt.datetime.today() - relativedelta(months=20),
+                            end_date = dt.datetime.today()
+                    ),], className="date_picker_down container column"),
+                    dcc.Store(id='toast_trigger'),
+                    dbc.Toast(
+                        id="toast",
+                        header="Notification",
+                        is_open=False,
+                        dismissable=True,
+                        duration=4000,
+                        children="",
+                        class_name="error_message container column"
+                    ),
+                
+                    dcc.Loading(children=[
+                        html.Div(id="indicators", className="container column"),
+                        ], 
+                        type="default"
+                    ),
+                ], className="container_indicators column"),
+                dcc.Loading(children=[
+                    html.Div(id="sentiment_post"),
+                    ], 
+                    type="default"
+                ),      
+            ], className="container sentiment_box row"),
+            html.Div([
+                dcc.Loading(
+                    children=[
+                        html.Img(id="wordcloud_post", className="wordcloud", style={"height": "280px", "width": "450px"})
+                    ],
+                    type="default"
+                )
+            ], className="container column words_div bg_dark")
+        ], className="container container_down row bg_dark"),
+    
         html.Div([
             dcc.Loading(
                 children=[
-                    dcc.Graph(id="stocks_graph", config={"responsive": True}, className="stocks_graph")
+                    dcc.Graph(id="chord_plot", className="container column bg_dark", style={"height": "400px", "width": "750px"})
                 ],
                 type="default"
-            )
-        ], className="stocks_graph_container")
-    ], className="container_up bg_dark"),
-    
-    html.Div([
-        html.Div([
+            ),
             dcc.Loading(
                 children=[
-                    html.Img(id="wordcloud_news", className="wordcloud", style={"height": "280px", "width": "450px"})
+                    dcc.Graph(id="density_plot", className="container column bg_dark", style={"height": "400px", "width": "750px"})
                 ],
                 type="default"
             )
-        ], className="container column words_div bg_dark"),
+        ], className="container container_density row bg_dark"),
+    
         html.Div([
-            dcc.Loading(children=[
-                html.Div(id="sentiment_news"),
-                ], 
+            dcc.Loading(
+                children=[
+                    dcc.Graph(id="boxplot_news", className="container column bg_dark", style={"height": "600px", "width": "340px"})
+                ],
                 type="default"
             ),
-            html.Div([
-                html.Div([
-                    dcc.DatePickerRange(
-                        id="date_picker_sentiments",
-                        min_date_allowed=session.query(func.min(RedditPost.date)).scalar(),
-                        max_date_allowed=session.query(func.max(RedditPost.date)).scalar(),
-                        start_date= dt.datetime.today() - relativedelta(months=20),
-                        end_date = dt.datetime.today()
-                ),], className="date_picker_down container column"),
-                dcc.Store(id='toast_trigger'),
-                dbc.Toast(
-                    id="toast",
-                    header="Notification",
-                    is_open=False,
-                    dismissable=True,
-                    duration=4000,
-                    children="",
-                    class_name="error_message container column"
-                ),
-                
-                dcc.Loading(children=[
-                    html.Div(id="indicators", className="container column"),
-                    ], 
-                    type="default"
-                ),
-            ], className="container_indicators column"),
-            dcc.Loading(children=[
-                html.Div(id="sentiment_post"),
-                ], 
+            dcc.Loading(
+                children=[
+                    dcc.Graph(id="density_3d_plot", className="container column bg_dark", style={"height": "600px", "width":"800px"})
+                ],
                 type="default"
-            ),      
-        ], className="container sentiment_box row"),
-        html.Div([
+            ),
             dcc.Loading(
                 children=[
-                    html.Img(id="wordcloud_post", className="wordcloud", style={"height": "280px", "width": "450px"})
+                    dcc.Graph(id="boxplot_post", className="container column bg_dark", style={"height": "600px", "width": "340px"})
                 ],
                 type="default"
-            )
-        ], className="container column words_div bg_dark")
-    ], className="container container_down row bg_dark"),
-    
-    html.Div([
-        dcc.Loading(
-            children=[
-                dcc.Graph(id="chord_plot", className="container column bg_dark", style={"height": "400px", "width": "750px"})
-            ],
-            type="default"
-        ),
-        dcc.Loading(
-            children=[
-                dcc.Graph(id="density_plot", className="container column bg_dark", style={"height": "400px", "width": "750px"})
-            ],
-            type="default"
-        )
-    ], className="container container_density row bg_dark"),
-    
-    html.Div([
-        dcc.Loading(
-            children=[
-                dcc.Graph(id="boxplot_news", className="container column bg_dark", style={"height": "600px", "width": "340px"})
-            ],
-            type="default"
-        ),
-        dcc.Loading(
-            children=[
-                dcc.Graph(id="density_3d_plot", className="container column bg_dark", style={"height": "600px", "width":"800px"})
-            ],
-            type="default"
-        ),
-        dcc.Loading(
-            children=[
-                dcc.Graph(id="boxplot_post", className="container column bg_dark", style={"height": "600px", "width": "340px"})
-            ],
-            type="default"
-        ),
-    ], className="container container_density row bg_dark")
+            ),
+        ], className="container container_density row bg_dark")
     
-], className="main_box container column bg_dark")
+    ], className="main_box container column bg_dark")
+
+
+app.layout = serve_layout
+
+
+def get_stock_info(selected_stock: str) -> dict:
+    """
+    Return the stocks_data.json entry for the selected stock, defaulting to the first one.
+
+    Parameters:
+    selected_stock (str): The selected stock nickname, or None.
+
+    Returns:
+    dict: The stock information.
+    """
+    with open("stocks_data.json", "r") as f:
+        stocks_data = json.load(f)
+    if selected_stock:
+        return next((item for item in stocks_data if item["nickname"] == selected_stock), None)
+    return stocks_data[0]
+
+
+def get_date_bounds(tenant: str) -> tuple:
+    """
+    Return the available stock and post date ranges of a tenant, cached per data version.
+
+    Parameters:
+    tenant (str): The tenant keyword.
+
+    Returns:
+    tuple: Min and max stock dates, then min and max post dates.
+    """
+    session = engine_registry.get(tenant)["SessionLocal"]()
+    try:
+        cache_key = sentiment_cache.make_key(tenant, None, None, DataVersion.current(session), "date_bounds")
+        bounds = sentiment_cache.get(cache_key)
+        if bounds is None:
+            stocks_bounds = session.execute(select(func.min(Stock.Date), func.max(Stock.Date))).one()
+            posts_bounds = session.execute(select(func.min(RedditPost.date), func.max(RedditPost.date))).one()
+            bounds = (*stocks_bounds, *posts_bounds)
+            sentiment_cache.set(cache_key, bounds)
+        return bounds
+    finally:
+        session.close()
+
+
+@callback(
+    Output("date_picker_stocks", "min_date_allowed"),
+    Output("date_picker_stocks", "max_date_allowed"),
+    Output("date_picker_sentiments", "min_date_allowed"),
+    Output("date_picker_sentiments", "max_date_allowed"),
+    Input("search_selector", "value")
+)
+def update_date_bounds(selected_stock: str) -> tuple:
+    """
+    Restrict both date pickers to the dates available for the selected stock.
+
+    Parameters:
+    selected_stock (str): The selected stock.
+
+    Returns:
+    tuple: Min and max allowed dates for the stock and sentiment pickers.
+    """
+    return get_date_bounds(get_stock_info(selected_stock)["nickname"])
+
 
 # Callback to update stock data
 @callback(
@@ -170,17 +239,11 @@ def update_stock_data(selected_stock: str, start_date: str, end_date: str) -> tu
     Returns:
     tuple: Updated title and stock figure.
     """
+    import graphics
+
     # Load stock information and set up database connection
-    with open("stocks_data.json", "r") as f:
-        stocks_data = json.load(f)
-        if selected_stock:
-            stock_info = next((item for item in stocks_data if item["nickname"] == selected_stock), None)
-            db_info = create_engine_and_sessions(selected_stock)
-            engine = db_info["engine"]
-        else:
-            stock_info = stocks_data[0]
-            db_info = create_engine_and_sessions(stock_info["nickname"])
-            engine = db_info["engine"]
+    stock_info = get_stock_info(selected_stock)
+    engine = engine_registry.get(stock_info["nickname"])["engine"]
 
     title = f"{stock_info['name'][:50]} ({stock_info['symbol']}) Exh: {stock_info['exchange']}"
     name = stock_info['nickname']
@@ -190,26 +253,231 @@ def update_stock_data(selected_stock: str, start_date: str, end_date: str) -> tu
 
     return title, stocks_figure
 
-# Callback to update sentiment data
+
+GOOD_COLOR = "#81d34d"
+BAD_COLOR = "#4a8ca3"
+
+_dataset_locks: dict = {}
+_dataset_locks_guard = threading.Lock()
+
+
+def load_sentiment_dataset(session, tenant: str, start_date: str, end_date: str, version: int) -> dict:
+    """
+    Fetch the news, posts and stock rows of a sentiment range once and share them across panels.
+
+    The sentiment panels are separate callbacks that Dash fires concurrently for the same
+    range, so the first one to arrive runs the queries while the others wait for its result.
+
+    Parameters:
+    session: SQLAlchemy session of the tenant.
+    tenant (str): The tenant keyword.
+    start_date (str): The start date for sentiment analysis.
+    end_date (str): The end date for sentiment analysis.
+    version (int): The tenant data version.
+
+    Raises:
+    ValueError: If any of the three datasets is empty.
+
+    Returns:
+    dict: The 'news', 'posts' and 'stocks' DataFrames, the aligned 'daily' frame and the merged 'word_counts'.
+    """
+    key = dataset_cache.make_key(tenant, start_date, end_date, version, "dataset")
+    with _dataset_locks_guard:
+        lock = _dataset_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        dataset = dataset_cache.get(key)
+        if dataset is None:
+            # Filter News and RedditPost data by sentiments date range, fetching only the plotted columns
+            dataset = {
+                "news": filter_columns_by_date(session, News, ["date", "sentiment_score"], start_date, end_date),
+                "posts": filter_columns_by_date(session, RedditPost, ["date", "sentiment_score"], start_date, end_date),
+                "stocks": filter_columns_by_date(session, Stock, ["Date", "Close"], start_date, end_date, date_column="Date"),
+            }
+            import graphics
+
+            # One aligned row per day, shared by the indicators and the correlation figures
+            dataset["daily"] = graphics.daily_frame(dataset["stocks"], dataset["news"], dataset["posts"])
+            # Word clouds merge the daily counts precomputed at ingest over the range actually returned
+            dataset["word_counts"] = {
+                source: DailyWordCount.merged_counts(session, source, frame["date"].min().date(), frame["date"].max().date())
+                if not frame.empty else {}
+                for source, frame in [("news", dataset["news"]), ("post", dataset["posts"])]
+            }
+            dataset_cache.set(key, dataset)
+
+    with _dataset_locks_guard:
+        _dataset_locks.pop(key, None)
+
+    if dataset["stocks"].empty or dataset["news"].empty or dataset["posts"].empty:
+        # If no data, the summary panel triggers the toast
+        raise ValueError("Invalid input for sentiment data.")
+    return dataset
+
+
+def sentiment_panel(name: str, selected_stock: str, start_date: str, end_date: str, build: Callable[[dict], tuple],
+                    empty: Callable[[Exception], tuple]) -> tuple:
+    """
+    Produce one panel of the sentiment section, serving it from the result cache when possible.
+
+    Parameters:
+    name (str): The panel name, part of the cache key.
+    selected_stock (str): The selected stock.
+    start_date (str): The start date for sentiment analysis.
+    end_date (str): The end date for sentiment analysis.
+    build (callable): Function turning the shared dataset into the panel outputs.
+    empty (callable): Factory building the outputs from the error raised when the range holds no data.
+
+    Returns:
+    tuple: The panel outputs.
+    """
+    tenant = get_stock_info(selected_stock)["nickname"]
+    session = engine_registry.get(tenant)["SessionLocal"]()
+    try:
+        # The data version changes on every ingest, so stale entries simply stop matching
+        version = DataVersion.current(session)
+        cache_key = sentiment_cache.make_key(tenant, start_date, end_date, version, name)
+        outputs = sentiment_cache.get(cache_key)
+        if outputs is None:
+            dataset = load_sentiment_dataset(session, tenant, start_date, end_date, version)
+            outputs = build(dataset)
+            sentiment_cache.set(cache_key, outputs)
+        return outputs
+    except ValueError as e:
+        return empty(e)
+    finally:
+        session.close()
+
+
+def build_summary(dataset: dict) -> tuple:
+    """
+    Build the price indicators and the average sentiment blocks.
+    """
+    daily = dataset["daily"]
+
+    # Get the stocks prices
+    closes = daily["close"].dropna()
+    start_price = round(closes.iloc[0], 2)
+    end_price = round(closes.iloc[-1], 2)
+    start_color = GOOD_COLOR if start_price >= end_price else BAD_COLOR
+    end_color = GOOD_COLOR if start_price <= end_price else BAD_COLOR
+
+    price_change = round(end_price - start_price, 2)
+    percentage_change_row = round(((end_price - start_price) / start_price) * 100, 2)
+    percentage_change = f"-{abs(percentage_change_row)}" if percentage_change_row < 0 else f"{percentage_change_row}"
+
+    price_color = GOOD_COLOR if price_change >= 0 else BAD_COLOR
+    percentage_color = GOOD_COLOR if price_change >= 0 else BAD_COLOR
+    
+    arrow_symbol = "▲" if price_change > 0 else "▼" if price_change < 0 else "─"
+    arrow_color = GOOD_COLOR if price_change > 0 else BAD_COLOR if price_change < 0 else "white"
+
+    indicators_div = html.Div([
+        html.Div(f"Start Price: ${start_price}", style={"color": start_color}),
+        html.Div(f"End Price: ${end_price}", style={"color": end_color}),
+        html.Div(f"Price Change: ${price_change}", style={"color": price_color}),
+        html.Div(f"Percent Change: {percentage_change}%", style={"color": percentage_color}),
+        html.Span(arrow_symbol, style={"color": arrow_color, "font-size": "30px"})
+    ], className="indicators container column fw_semibold fs_accent")
+    
+    # Calculate average sentiment score based on filtered data
+    sentiment_news = round((daily["news_sentiment"] * daily["news_count"]).sum() / daily["news_count"].sum(), 2)
+    sentiment_post = round((daily["post_sentiment"] * daily["post_count"]).sum() / daily["post_count"].sum(), 2)
+    news_color = GOOD_COLOR if sentiment_news >=0 else BAD_COLOR
+    post_color = GOOD_COLOR if sentiment_post >=0 else BAD_COLOR
+    label_news = "Positive" if sentiment_news > 0 else "Negative"
+    label_post = "Positive" if sentiment_post > 0 else "Negative"
+    
+    post_sentiment = html.Div([
+        html.Span("Post sentiment:", className="sentiment_title"),
+        html.Span(label_post, className="sentiment_title fw_bold", style={"color": post_color}),
+        html.Div(
+            f"{sentiment_post}",
+            className="sentiment_number",
+            style={"color": post_color}
+            )
+    ], className="container column sentiment fs_accent")
+
+    news_sentiment = html.Div([
+        html.Span("News sentiment:", className="sentiment_title"),
+        html.Span(label_news, className="sentiment_title fw_bold", style={"color": news_color}),
+        html.Div(
+            f"{sentiment_news}",
+            className="sentiment_number",
+            style={"color": news_color}
+            )
+    ], className="container column sentiment fs_accent")
+
+    return indicators_div, post_sentiment, news_sentiment, None
+
+
+def build_chord_plot(dataset: dict):
+    """
+    Build the sentiment vs price change chord plot.
+    """
+    import graphics
+
+    return graphics.chord_correlation_plot(dataset["daily"])
+
+
+def build_density_plot(dataset: dict):
+    """
+    Build the news and post sentiment density plot.
+    """
+    import graphics
+
+    return graphics.combined_sentiment_histogram_area_plot(dataset["news"], dataset["posts"], "News", "Post", "#1f978b", "#39658c")
+
+
+def build_boxplots(dataset: dict) -> tuple:
+    """
+    Build the news and post sentiment boxplots.
+    """
+    import graphics
+
+    return (
+        graphics.sentiment_boxplot(dataset["news"], "News", "#1f978b"),
+        graphics.sentiment_boxplot(dataset["posts"], "Post", "#39658c"),
+    )
+
+
+def build_density_3d_plot(dataset: dict):
+    """
+    Build the 3D sentiment vs price change surface.
+    """
+    import graphics
+
+    return graphics.density_3d_plot(dataset["daily"])
+
+
+def build_wordclouds(dataset: dict) -> tuple:
+    """
+    Build the news and post word clouds, leaving out a cloud whose source has no words in the range.
+    """
+    import graphics
+
+    mime = f"image/{graphics.WORDCLOUD_FORMAT}"
+
+    def wordcloud(counts: dict):
+        # WordCloud cannot lay out an empty cloud, which must not blank the other one
+        return f"data:{mime};base64,{graphics.frequencies_plot(counts)}" if counts else None
+
+    return wordcloud(dataset['word_counts']['news']), wordcloud(dataset['word_counts']['post'])
+
+
+# Callbacks to update sentiment data, one per panel so cheap widgets paint first
 @callback(
-    Output("wordcloud_news", "src"), 
-    Output("wordcloud_post", "src"),
     Output("indicators", "children"),
     Output("sentiment_post", "children"),
     Output("sentiment_news", "children"),
-    Output("chord_plot", "figure"),
-    Output("density_plot", "figure"),
-    Output("boxplot_news", "figure"),
-    Output("density_3d_plot", "figure"),
-    Output("boxplot_post", "figure"),
     Output('toast_trigger', 'data'),
     Input("search_selector", "value"),
     Input("date_picker_sentiments", "start_date"),
     Input("date_picker_sentiments", "end_date")
 )
-def update_sentiment_data(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str) -> tuple:
+def update_sentiment_summary(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str) -> tuple:
     """
-    Update sentiment data, word clouds, and density plots based on user input.
+    Update price indicators and average sentiment scores based on user input.
 
     Parameters:
     selected_stock (str): The selected stock.
@@ -217,118 +485,94 @@ def update_sentiment_data(selected_stock: str, sentiments_start_date: str, senti
     sentiments_end_date (str): The end date for sentiment analysis.
 
     Returns:
-    tuple: Updated word clouds, sentiment scores, labels, and density plots.
+    tuple: Updated indicators, sentiment labels and toast message.
     """
-    # Load stock information and set up database connection
-    try:
-        with open("stocks_data.json", "r") as f:
-            stocks_data = json.load(f)
-            if selected_stock:
-                stock_info = next((item for item in stocks_data if item["nickname"] == selected_stock), None)
-                db_info = create_engine_and_sessions(selected_stock)
-            else:
-                stock_info = stocks_data[0]
-                db_info = create_engine_and_sessions(stock_info["nickname"])
-
-        session = db_info["SessionLocal"]()
-
-        # Filter News and RedditPost data by sentiments date range
-        filtered_news = filter_data_by_date(session, News, sentiments_start_date, sentiments_end_date)
-        filtered_posts = filter_data_by_date(session, RedditPost, sentiments_start_date, sentiments_end_date)
-        filtered_stocks = filter_data_by_date(session, stocks_table, sentiments_start_date, sentiments_end_date, date_column="Date")    
-
-        if not filtered_stocks or not filtered_news or not filtered_posts:
-            # If no data, return a value to trigger the toast
-            raise ValueError("Invalid input for sentiment data.")
-
-        
-        good_color = "#81d34d"
-        bad_color = "#4a8ca3"
-        
-        # Get the stocks prices
-        start_price = round(filtered_stocks[0].Close, 2)
-        end_price = round(filtered_stocks[-1].Close, 2)
-        start_color = good_color if start_price >= end_price else bad_color
-        end_color = good_color if start_price <= end_price else bad_color
-
-        price_change = round(end_price - start_price, 2)
-        percentage_change_row = round(((end_price - start_price) / start_price) * 100, 2)
-        percentage_change = f"-{abs(percentage_change_row)}" if percentage_change_row < 0 else f"{percentage_change_row}"
-
-        price_color = good_color if price_change >= 0 else bad_color
-        percentage_color = good_color if price_change >= 0 else bad_color
-        
-        arrow_symbol = "▲" if price_change > 0 else "▼" if price_change < 0 else "─"
-        arrow_color = good_color if price_change > 0 else bad_color if price_change < 0 else "white"
-
-        indicators_div = html.Div([
-            html.Div(f"Start Price: ${start_price}", style={"color": start_color}),
-            html.Div(f"End Price: ${end_price}", style={"color": end_color}),
-            html.Div(f"Price Change: ${price_change}", style={"color": price_color}),
-            html.Div(f"Percent Change: {percentage_change}%", style={"color": percentage_color}),
-            html.Span(arrow_symbol, style={"color": arrow_color, "font-size": "30px"})
-        ], className="indicators container column fw_semibold fs_accent")
-        
-        # Calculate average sentiment score based on filtered data
-        sentiment_news = round(sum([entry.sentiment_score for entry in filtered_news]) / len(filtered_news), 2) if filtered_news else 0
-        sentiment_post = round(sum([entry.sentiment_score for entry in filtered_posts]) / len(filtered_posts), 2) if filtered_posts else 0
-        news_color = good_color if sentiment_news >=0 else bad_color
-        post_color = good_color if sentiment_post >=0 else bad_color
-        label_news = "Positive" if sentiment_news > 0 else "Negative"
-        label_post = "Positive" if sentiment_post > 0 else "Negative"
-        
-        post_sentiment = html.Div([
-            html.Span("Post sentiment:", className="sentiment_title"),
-            html.Span(label_post, className="sentiment_title fw_bold", style={"color": post_color}),
-            html.Div(
-                f"{sentiment_post}",
-                className="sentiment_number",
-                style={"color": post_color}
-                )
-        ], className="container column sentiment fs_accent")
-
-        news_sentiment = html.Div([
-            html.Span("News sentiment:", className="sentiment_title"),
-            html.Span(label_news, className="sentiment_title fw_bold", style={"color": news_color}),
-            html.Div(
-                f"{sentiment_news}",
-                className="sentiment_number",
-                style={"color": news_color}
-                )
-        ], className="container column sentiment fs_accent")
-        
-        # Generate word clouds based on filtered text data
-        news_text = " ".join([entry.title for entry in filtered_news])
-        post_text = " ".join([entry.title + " " + entry.content for entry in filtered_posts])
-        
-        wordcloud_news = f"data:image/png;base64,{graphics.words_plot(news_text)}"
-        wordcloud_post = f"data:image/png;base64,{graphics.words_plot(post_text)}"
-
-        # Generate density plots for sentiment scores
-        chord_plot = graphics.chord_correlation_plot(filtered_stocks, filtered_news, filtered_posts)
-        density_plot = graphics.combined_sentiment_histogram_area_plot(filtered_news, filtered_posts, "News", "Post", "#1f978b", "#39658c")
-        
-        boxplot_news = graphics.sentiment_boxplot(filtered_news, "News", "#1f978b")
-        density_3d_plot = graphics.density_3d_plot(filtered_stocks, filtered_news, filtered_posts)
-        boxplot_post = graphics.sentiment_boxplot(filtered_posts, "Post", "#39658c")
-        session.close()
+    return sentiment_panel(
+        "summary", selected_stock, sentiments_start_date, sentiments_end_date, build_summary,
+        lambda e: (None, None, None, f'No data available for the selected date range.\n{e}')
+    )
 
-        return (
-            wordcloud_news,
-            wordcloud_post,
-            indicators_div,
-            post_sentiment,
-            news_sentiment,
-            chord_plot,
-            density_plot,
-            boxplot_news,
-            density_3d_plot,
-            boxplot_post,
-            None
-        )
-    except ValueError as e:
-        session.close()
-        return (None, None, None, None, None, None, None, None, None, None, f'No data available for the selected date range.\n{e}')
+
+@callback(
+    Output("wordcloud_news", "src"), 
+    Output("wordcloud_post", "src"),
+    Input("search_selector", "value"),
+    Input("date_picker_sentiments", "start_date"),
+    Input("date_picker_sentiments", "end_date")
+)
+def update_wordclouds(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str) -> tuple:
+    """
+    Update the news and post word clouds based on user input.
+    """
+    return sentiment_panel(
+        "wordclouds", selected_stock, sentiments_start_date, sentiments_end_date, build_wordclouds,
+        lambda e: (None, None)
+    )
+
+
+@callback(
+    Output("chord_plot", "figure"),
+    Input("search_selector", "value"),
+    Input("date_picker_sentiments", "start_date"),
+    Input("date_picker_sentiments", "end_date")
+)
+def update_chord_plot(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str):
+    """
+    Update the sentiment vs price change chord plot based on user input.
+    """
+    return sentiment_panel(
+        "chord", selected_stock, sentiments_start_date, sentiments_end_date, build_chord_plot,
+        lambda e: None
+    )
+
+
+@callback(
+    Output("density_plot", "figure"),
+    Input("search_selector", "value"),
+    Input("date_picker_sentiments", "start_date"),
+    Input("date_picker_sentiments", "end_date")
+)
+def update_density_plot(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str):
+    """
+    Update the sentiment score density plot based on user input.
+    """
+    return sentiment_panel(
+        "density", selected_stock, sentiments_start_date, sentiments_end_date, build_density_plot,
+        lambda e: None
+    )
+
+
+@callback(
+    Output("boxplot_news", "figure"),
+    Output("boxplot_post", "figure"),
+    Input("search_selector", "value"),
+    Input("date_picker_sentiments", "start_date"),
+    Input("date_picker_sentiments", "end_date")
+)
+def update_boxplots(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str) -> tuple:
+    """
+    Update the news and post sentiment boxplots based on user input.
+    """
+    return sentiment_panel(
+        "boxplots", selected_stock, sentiments_start_date, sentiments_end_date, build_boxplots,
+        lambda e: (None, None)
+    )
+
+
+@callback(
+    Output("density_3d_plot", "figure"),
+    Input("search_selector", "value"),
+    Input("date_picker_sentiments", "start_date"),
+    Input("date_picker_sentiments", "end_date")
+)
+def update_density_3d_plot(selected_stock: str, sentiments_start_date: str, sentiments_end_date: str):
+    """
+    Update the 3D sentiment vs price change surface based on user input.
+    """
+    return sentiment_panel(
+        "density_3d", selected_stock, sentiments_start_date, sentiments_end_date, build_density_3d_plot,
+        lambda e: None
+    )
 
 @app.callback(
     Output("toast", "is_open"),
@@ -341,4 +585,5 @@ def show_toast(message):
     return False, ""
 
 if __name__ == "__main__":
-    app.run_server(host="0.0.0.0", port=8050)
+    # Threaded so the per-panel sentiment callbacks are served concurrently
+    app.run_server(host="0.0.0.0", port=8050, threaded=True)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Date, Integer, Float, String, DateTime, ForeignKey, delete, func, inspect, literal, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
 from sqlalchemy.orm import declarative_base, relationship, Session
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, ProgrammingError
 from db_manager import async_no_autoflush
+from collections import Counter
+from datetime import timedelta
 
 Base = declarative_base()
 
@@ -36,6 +39,85 @@ async def async_create_tables(async_engine: AsyncEngine) -> None:
         await conn.run_sync(Base.metadata.create_all)
 
 
+# B-tree indexes backing the date range filters and the nearest-date probes
+DATE_INDEXES = {
+    "ix_news_date": ("news", "date"),
+    "ix_rposts_date": ("rposts", "date"),
+    "ix_comments_date": ("comments", "date"),
+}
+
+
+def create_date_indexes(engine) -> None:
+    """
+    Create the date indexes on existing tables, skipping tables that do not exist yet.
+
+    Safe to run repeatedly: indexes that are already present are left untouched. The stocks
+    table is keyed by "Date", so its primary key already serves date range scans.
+
+    Parameters:
+    engine: SQLAlchemy engine to connect to the database.
+
+    Returns:
+    None
+    """
+    with engine.begin() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+        preparer = conn.dialect.identifier_preparer
+        for index_name, (table_name, column_name) in DATE_INDEXES.items():
+            if table_name not in existing_tables:
+                continue
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {preparer.quote(index_name)} "
+                f"ON {preparer.quote(table_name)} ({preparer.quote(column_name)})"
+            ))
+
+
+def add_missing_columns(engine) -> None:
+    """
+    Add model columns that existing tables are missing, such as the scoring version columns.
+
+    Only nullable columns without server defaults are handled, which is all this schema adds
+    after a table is first created. IF NOT EXISTS keeps a concurrent migration of the same
+    tenant from failing on a column the other one just added.
+
+    Parameters:
+    engine: SQLAlchemy engine to connect to the database.
+
+    Returns:
+    None
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        preparer = conn.dialect.identifier_preparer
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN IF NOT EXISTS {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+                ))
+
+
+def migrate_database(engine) -> None:
+    """
+    Bring a tenant database up to the current models: new tables, new columns and date indexes.
+
+    Parameters:
+    engine: SQLAlchemy engine to connect to the database.
+
+    Returns:
+    None
+    """
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    create_date_indexes(engine)
+
+
 def wipe_database(engine) -> None:
     """
     Drop all tables in the database.
@@ -56,11 +138,13 @@ class News(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     publisher = Column(String)
-    date = Column(DateTime)
+    date = Column(DateTime, index=True)
     source = Column(String)
     sentiment_score = Column(Float, nullable=True)
     sentiment_label = Column(String, nullable=True)
+    sentiment_model = Column(String, nullable=True)
     keywords = Column(String, nullable=True)
+    keywords_version = Column(String, nullable=True)
     link = Column(String, unique=True)
 
     def __repr__(self) -> str:
@@ -131,7 +215,7 @@ class Comment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String)
-    date = Column(DateTime)
+    date = Column(DateTime, index=True)
     post_id = Column(Integer, ForeignKey('rposts.id'), index=True)
     author_id = Column(Integer, ForeignKey('authors.id'), index=True)
 
@@ -149,12 +233,14 @@ class RedditPost(Base):
     title = Column(String)
     content = Column(String)
     subreddit = Column(String)
-    date = Column(DateTime)
+    date = Column(DateTime, index=True)
     author_id = Column(Integer, ForeignKey('authors.id'), index=True)
     link_id = Column(Integer, ForeignKey('links.id'), index=True)
     sentiment_score = Column(Float, nullable=True)
     sentiment_label = Column(String, nullable=True)
+    sentiment_model = Column(String, nullable=True)
     keywords = Column(String, nullable=True)
+    keywords_version = Column(String, nullable=True)
 
     author = relationship("Author", back_populates="posts", lazy="selectin")
     comments = relationship("Comment", back_populates="post", lazy="selectin")
@@ -201,3 +287,172 @@ class RedditPost(Base):
     def __repr__(self) -> str:
         formatted_date = self.date.strftime("%a, %d %b %Y %H:%M:%S") if self.date else 'No Date'
         return f"<{self.title} from {self.author} on {formatted_date})>"
+
+
+class Stock(Base):
+    __tablename__ = "stocks"
+
+    Date = Column(DateTime, primary_key=True)
+    Open = Column(Float)
+    High = Column(Float)
+    Low = Column(Float)
+    Close = Column(Float)
+    Volume = Column(BigInteger)
+
+    # Indicators computed once at ingest by stocks.compute_indicators
+    SMA = Column(Float, nullable=True)
+    BB_High = Column(Float, nullable=True)
+    BB_Mid = Column(Float, nullable=True)
+    BB_Low = Column(Float, nullable=True)
+    MACD = Column(Float, nullable=True)
+    MACD_Signal = Column(Float, nullable=True)
+    MACD_Hist = Column(Float, nullable=True)
+
+    def __repr__(self) -> str:
+        formatted_date = self.Date.strftime("%a, %d %b %Y") if self.Date else 'No Date'
+        return f"<Close {self.Close} on {formatted_date}>"
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+    @classmethod
+    def current(cls, session: Session) -> int:
+        """
+        Return the tenant data version, or 0 if nothing has been recorded yet.
+        """
+        try:
+            version = session.query(cls.version).filter(cls.id == 1).scalar()
+        except ProgrammingError:
+            # The table predates this tenant's last write
+            session.rollback()
+            return 0
+        return version or 0
+
+    @classmethod
+    def bump(cls, session: Session) -> None:
+        """
+        Increment the tenant data version so results cached against older data stop matching.
+        """
+        cls.__table__.create(bind=session.connection(), checkfirst=True)
+        statement = insert(cls).values(id=1, version=1, updated_at=func.now())
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[cls.id],
+            set_={"version": cls.version + 1, "updated_at": func.now()}
+        ))
+
+
+class PostKeyword(Base):
+    __tablename__ = "post_keywords"
+
+    post_id = Column(Integer, ForeignKey('rposts.id', ondelete="CASCADE"), primary_key=True)
+    term = Column(String, primary_key=True)
+    score = Column(Float)
+    date = Column(DateTime, index=True)
+
+
+class NewsKeyword(Base):
+    __tablename__ = "news_keywords"
+
+    news_id = Column(Integer, ForeignKey('news.id', ondelete="CASCADE"), primary_key=True)
+    term = Column(String, primary_key=True)
+    score = Column(Float)
+    date = Column(DateTime, index=True)
+
+
+class DailyTermCount(Base):
+    """
+    Number of documents per day whose keywords include a term, for posts and news separately.
+    """
+    __tablename__ = "daily_term_counts"
+
+    # Primary key order serves "top terms of a source between two days" as an index range scan
+    source = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    term = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+    SOURCES = {"post": PostKeyword, "news": NewsKeyword}
+
+    @classmethod
+    def refresh(cls, session: Session, source: str, days) -> None:
+        """
+        Recompute the rollup of the given days from the keyword table of the source.
+        """
+        days = sorted(days)
+        if not days:
+            return
+        keyword_model = cls.SOURCES[source]
+        day = func.date(keyword_model.date)
+        # The range lets the date index narrow the scan before the per-day filter
+        session.execute(delete(cls).where(cls.source == source, cls.day.in_(days)))
+        session.execute(cls.__table__.insert().from_select(
+            ["source", "day", "term", "count"],
+            select(literal(source), day, keyword_model.term, func.count())
+            .where(keyword_model.date >= days[0], keyword_model.date < days[-1] + timedelta(days=1), day.in_(days))
+            .group_by(day, keyword_model.term)
+        ))
+
+    @classmethod
+    def top_terms(cls, session: Session, source: str, start_date, end_date, limit: int = 100):
+        """
+        Return the most frequent terms of a source between two dates, as (term, count) rows.
+        """
+        total = func.sum(cls.count).label("count")
+        return session.execute(
+            select(cls.term, total)
+            .where(cls.source == source, cls.day >= start_date, cls.day <= end_date)
+            .group_by(cls.term)
+            .order_by(total.desc())
+            .limit(limit)
+        ).all()
+
+
+class DailyWordCount(Base):
+    """
+    Word counts of the posts or news of one day, as fed to the word clouds.
+    """
+    __tablename__ = "daily_word_counts"
+
+    source = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    word = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+    @classmethod
+    def replace_days(cls, session: Session, source: str, counts_by_day: dict, words_per_day: int = 1000) -> None:
+        """
+        Replace the stored counts of the given days with freshly computed ones.
+
+        Only the `words_per_day` most frequent words of each day are kept: the long tail of
+        rare words would otherwise dominate the table while rarely reaching a range's top words.
+        """
+        if not counts_by_day:
+            return
+        session.execute(delete(cls).where(cls.source == source, cls.day.in_(list(counts_by_day))))
+        rows = [
+            {"source": source, "day": day, "word": word, "count": count}
+            for day, counts in counts_by_day.items()
+            for word, count in Counter(counts).most_common(words_per_day)
+        ]
+        if rows:
+            session.execute(cls.__table__.insert(), rows)
+
+    @classmethod
+    def merged_counts(cls, session: Session, source: str, start_date, end_date, limit: int = 500) -> dict:
+        """
+        Merge the daily counts of a date range into the most frequent words of the whole range.
+        """
+        total = func.sum(cls.count).label("count")
+        rows = session.execute(
+            select(cls.word, total)
+            .where(cls.source == source, cls.day >= start_date, cls.day <= end_date)
+            .group_by(cls.word)
+            .order_by(total.desc())
+            .limit(limit)
+        ).all()
+        return {word: count for word, count in rows}
@@ -0,0 +1,207 @@
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+class MemoryBackend:
+    """
+    In-process LRU store of serialized results, bounded by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Tuple, bytes] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: Tuple, payload: bytes) -> None:
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def invalidate(self, tenant: str) -> None:
+        for key in [key for key in self._entries if key[0] == tenant]:
+            self._size -= len(self._entries.pop(key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'bytes': self._size}
+
+
+class DiskBackend:
+    """
+    On-disk store of serialized results, one directory per tenant so it can be dropped at once.
+
+    Being shared through the filesystem, it survives restarts and is visible to every worker
+    process on the host, including the ingestion jobs that invalidate it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Tuple) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[0], f"{digest}.pkl")
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: Tuple, payload: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, tenant: str) -> None:
+        shutil.rmtree(os.path.join(self.directory, tenant), ignore_errors=True)
+
+    def clear(self) -> None:
+        for tenant in os.listdir(self.directory):
+            self.invalidate(tenant)
+
+    def stats(self) -> Dict[str, int]:
+        entries = 0
+        size = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    entries += 1
+                    size += os.path.getsize(os.path.join(root, name))
+        return {'entries': entries, 'bytes': size}
+
+
+class ResultCache:
+    """
+    Server-side cache for dashboard results keyed by (tenant, start, end, data version).
+
+    Results are pickled once on store and kept in an in-process LRU, optionally backed by a
+    DiskBackend that is consulted on memory misses.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024, directory: str = None):
+        self.memory = MemoryBackend(max_entries, max_bytes)
+        self.disk = DiskBackend(directory) if directory else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(tenant: str, start_date: str, end_date: str, version: int, name: str = "sentiment") -> Tuple:
+        """
+        Build the cache key for a dashboard result.
+
+        Parameters:
+        tenant (str): The tenant keyword.
+        start_date (str): The start date of the requested range.
+        end_date (str): The end date of the requested range.
+        version (int): The tenant data version the result was computed from.
+        name (str): Which result is cached (default is 'sentiment').
+
+        Returns:
+        tuple: The cache key.
+        """
+        return (tenant.lower(), str(start_date), str(end_date), version, name)
+
+    def get(self, key: Tuple) -> Any:
+        """
+        Return the cached result for the key, or None on a miss.
+        """
+        with self._lock:
+            payload = self.memory.get(key)
+            if payload is None and self.disk is not None:
+                payload = self.disk.get(key)
+                if payload is not None:
+                    self.memory.set(key, payload)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(payload)
+
+    def set(self, key: Tuple, value: Any) -> None:
+        """
+        Serialize and store a result under the key.
+        """
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.memory.set(key, payload)
+            if self.disk is not None:
+                self.disk.set(key, payload)
+
+    def invalidate(self, tenant: str) -> None:
+        """
+        Drop every cached result of the given tenant.
+
+        Parameters:
+        tenant (str): The tenant keyword.
+        """
+        with self._lock:
+            self.memory.invalidate(tenant.lower())
+            if self.disk is not None:
+                self.disk.invalidate(tenant.lower())
+
+    def clear(self) -> None:
+        with self._lock:
+            self.memory.clear()
+            if self.disk is not None:
+                self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit ratio and memory use of the cache.
+
+        Returns:
+        dict: Hits, misses, hit ratio and per-backend entry and byte counts.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'memory': self.memory.stats(),
+            }
+            if self.disk is not None:
+                stats['disk'] = self.disk.stats()
+        return stats
+
+
+sentiment_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "64")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    directory=os.getenv("RESULT_CACHE_DIR"),
+)
+
+# Short-lived store of the raw rows behind a sentiment range, shared by the panel callbacks
+dataset_cache = ResultCache(max_entries=int(os.getenv("DATASET_CACHE_SIZE", "8")))
+
+# Content-addressed store of rendered images; keys never go stale, so it is never invalidated
+render_cache = ResultCache(
+    max_entries=int(os.getenv("RENDER_CACHE_SIZE", "128")),
+    max_bytes=int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
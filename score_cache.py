@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from db_manager import get_shared_engines
+
+# Shared by every tenant, so it lives outside the tenant tables in a common schema
+SCORE_CACHE_SCHEMA = os.getenv("SCORE_CACHE_SCHEMA", "public")
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "5000000"))
+LOOKUP_CHUNK_SIZE = 1000
+
+metadata = MetaData()
+
+score_cache = Table(
+    "sentiment_score_cache",
+    metadata,
+    Column("model_id", String, primary_key=True),
+    Column("text_hash", String(40), primary_key=True),
+    Column("score", Float, nullable=False),
+    Column("label", String, nullable=False),
+    Column("last_used", DateTime, nullable=False, index=True),
+    schema=SCORE_CACHE_SCHEMA,
+)
+
+_whitespace = re.compile(r"\s+")
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash a text after normalizing case and whitespace, so trivially different copies share a key.
+
+    Parameters:
+    text (str): The text to hash.
+
+    Returns:
+    str: The SHA-1 hex digest of the normalized text.
+    """
+    normalized = _whitespace.sub(" ", text or "").strip().casefold()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def score_cache_engine():
+    """
+    Return the engine the score cache is created and read through.
+
+    Tenants log in as their own role in database tenancy mode, so a table created by one of
+    them would be owned by that role and unreadable by the others. The cache is therefore
+    always accessed as DB_USER, through the shared engine.
+
+    Returns:
+    Engine: The shared DB_USER engine.
+    """
+    return get_shared_engines()["engine"]
+
+
+def create_score_cache(engine) -> None:
+    """
+    Create the shared score cache table if it does not exist yet.
+
+    Parameters:
+    engine: The engine from `score_cache_engine`.
+
+    Returns:
+    None
+    """
+    metadata.create_all(bind=engine, checkfirst=True)
+
+
+def lookup_scores(engine, model_id: str, hashes: Iterable[str]) -> Dict[str, Tuple[float, str]]:
+    """
+    Fetch cached scores for many text hashes at once and mark them as recently used.
+
+    Parameters:
+    engine: The engine from `score_cache_engine`.
+    model_id (str): The model version that produced the scores.
+    hashes (Iterable[str]): The text hashes to look up.
+
+    Returns:
+    Dict[str, Tuple[float, str]]: Score and label of every hash found in the cache.
+    """
+    hashes = list(set(hashes))
+    found = {}
+    with engine.begin() as conn:
+        for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + LOOKUP_CHUNK_SIZE]
+            rows = conn.execute(
+                select(score_cache.c.text_hash, score_cache.c.score, score_cache.c.label)
+                .where(score_cache.c.model_id == model_id, score_cache.c.text_hash.in_(chunk))
+            ).all()
+            if not rows:
+                continue
+            found.update({row.text_hash: (row.score, row.label) for row in rows})
+            conn.execute(
+                update(score_cache)
+                .where(score_cache.c.model_id == model_id, score_cache.c.text_hash.in_([row.text_hash for row in rows]))
+                .values(last_used=func.now())
+            )
+    return found
+
+
+def store_scores(engine, model_id: str, scores: Dict[str, Tuple[float, str]]) -> None:
+    """
+    Insert newly computed scores, leaving entries another tenant stored first untouched.
+
+    Parameters:
+    engine: The engine from `score_cache_engine`.
+    model_id (str): The model version that produced the scores.
+    scores (Dict[str, Tuple[float, str]]): Score and label per text hash.
+
+    Returns:
+    None
+    """
+    # Stamped by the database clock, like the lookups that refresh it
+    records = [
+        {"model_id": model_id, "text_hash": digest, "score": score, "label": label, "last_used": func.now()}
+        for digest, (score, label) in scores.items()
+    ]
+    with engine.begin() as conn:
+        for start in range(0, len(records), LOOKUP_CHUNK_SIZE):
+            conn.execute(insert(score_cache).values(records[start:start + LOOKUP_CHUNK_SIZE]).on_conflict_do_nothing())
+
+
+def evict_scores(engine, max_entries: int = SCORE_CACHE_MAX_ENTRIES) -> int:
+    """
+    Delete the least recently used entries once the cache grows past its size bound.
+
+    Parameters:
+    engine: The engine from `score_cache_engine`.
+    max_entries (int): Number of entries to keep.
+
+    Returns:
+    int: The number of entries removed.
+    """
+    with engine.begin() as conn:
+        excess = conn.execute(select(func.count()).select_from(score_cache)).scalar() - max_entries
+        if excess <= 0:
+            return 0
+        oldest = (
+            select(score_cache.c.model_id, score_cache.c.text_hash)
+            .order_by(score_cache.c.last_used)
+            .limit(excess)
+        )
+        conn.execute(delete(score_cache).where(tuple_(score_cache.c.model_id, score_cache.c.text_hash).in_(oldest)))
+    return excess
@@ -2,11 +2,11 @@ from bs4 import BeautifulSoup
 import asyncio
 from playwright.async_api import async_playwright
 import requests
-from models import News, Author, Comment, RedditPost, Link, create_tables, wipe_database
-from db_manager import get_session, async_get_session, create_db, create_engine_and_sessions
+from models import News, Author, Comment, RedditPost, Link, create_tables, migrate_database, wipe_database
+from db_manager import get_session, async_get_session, create_db, create_schema, create_engine_and_sessions, dispose_shared_engines, TENANCY_MODE
 from datetime import datetime
 from text_analysis import update_sentiment, update_words
-from stocks import inject_stock
+from stocks import inject_stock, inject_stocks
 from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple
 
@@ -20,9 +20,13 @@ def initialize_db(db_name: str):
     Returns:
     dict: A dictionary containing database connection details.
     """
-    create_db(db_name)
+    if TENANCY_MODE == "schema":
+        create_schema(db_name)
+    else:
+        create_db(db_name)
     db_connections = create_engine_and_sessions(db_name)
     create_tables(db_connections["engine"])
+    migrate_database(db_connections["engine"])
     return db_connections
 
 
@@ -224,7 +228,7 @@ async def process_all_posts(async_session_maker, keyword, s_date, e_date):
         await browser.close()
 
 
-def run_pipeline(keyword, start_date, end_date, wipe=False):
+def run_pipeline(keyword, start_date, end_date, wipe=False, initialize=True):
     """
     Run the entire scraping pipeline for Google News and Reddit.
 
@@ -232,11 +236,14 @@ def run_pipeline(keyword, start_date, end_date, wipe=False):
     keyword (str): Search keyword.
     start_date (str): Start date for data extraction.
     end_date (str): End date for data extraction.
+    wipe (bool): Drop and recreate the tables first.
+    initialize (bool): Create and migrate the database first. Pass False when the caller
+    already did, so parallel pipelines do not run the same DDL concurrently.
 
     Returns:
     None
     """
-    db_details = initialize_db(keyword)
+    db_details = initialize_db(keyword) if initialize else create_engine_and_sessions(keyword)
     if wipe is True:
         wipe_database(db_details["engine"])
         create_tables(db_details["engine"])
@@ -269,8 +276,12 @@ def main(keyword):
         ("2024-05-23", "2024-11-07"),
     ]
 
+    # Create and migrate the tenant once, before the workers start writing to it
+    initialize_db(keyword)
+    # Forked workers must not inherit the connection migrating the tenant left in the shared pool
+    dispose_shared_engines()
     with ProcessPoolExecutor() as executor:
-        futures = [executor.submit(run_pipeline, keyword, start, end) for start, end in date_ranges]
+        futures = [executor.submit(run_pipeline, keyword, start, end, initialize=False) for start, end in date_ranges]
         
         # Optionally, wait for all tasks to complete and handle exceptions
         for future in futures:
@@ -287,8 +298,7 @@ if __name__ == "__main__":
     keyword= "Microsoft"
     
     all_kw = ["Ubisoft", "Nvidia", "Tencent", "Intel", "Boeing", "Apple", "Microsoft"]
-    for nickname in all_kw:
-        inject_stock(nickname)
+    inject_stocks(all_kw)
     
     # run_pipeline(keyword, "2005-05-23", "2024-11-19")
     # run_pipeline(keyword, "2024-11-17", "2024-11-18")
@@ -1,8 +1,19 @@
 import yfinance as yf
 import pandas as pd
 import json
+import time
+import talib as ta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from curl_cffi import requests
-from db_manager import create_engine_and_sessions
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from db_manager import create_engine_and_sessions, get_session
+from models import DataVersion, Stock
+from result_cache import sentiment_cache
+
+# Bars of history needed before a new bar for its indicators to match a full-history run.
+# SMA/BBANDS need 20 and MACD 26 + 9; the rest lets the EMAs in MACD converge.
+INDICATOR_WARMUP = 300
 
 
 
@@ -40,18 +51,22 @@ def get_symbols(keyword: str) -> list[dict]:
         print(e)
 
 
-def get_stock(symbol: str, period: str = "max") -> pd.DataFrame:
+def get_stock(symbol: str, period: str = "max", start=None) -> pd.DataFrame:
     """
     Downloads stock data for the given symbol and period from Yahoo Finance.
 
     Parameters:
     symbol (str): The stock symbol to download data for.
     period (str): The time period for the data. Default is "max".
+    start: Only download bars from this date on. Overrides period when given.
 
     Returns:
     pd.DataFrame: A DataFrame containing the stock data.
     """
-    df = yf.download(symbol, group_by="Ticker", period=period, auto_adjust=True)
+    if start is not None:
+        df = yf.download(symbol, group_by="Ticker", start=start, auto_adjust=True)
+    else:
+        df = yf.download(symbol, group_by="Ticker", period=period, auto_adjust=True)
     df.columns = [col[1] for col in df.columns]
     return df
 
@@ -71,47 +86,362 @@ def get_from_date(query_df: pd.DataFrame, date: str) -> pd.Series:
     return query_df.asof(query_date)
 
 
-def inject_stock(keyword: str, period: str = "max") -> None:
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds SMA, Bollinger Bands and MACD columns computed from the Close prices.
+
+    Parameters:
+    df (pd.DataFrame): Bars ordered by date with a "Close" column.
+
+    Returns:
+    pd.DataFrame: The same bars with the indicator columns attached.
+    """
+    df = df.copy()
+    close = df["Close"].astype(float)
+    df["SMA"] = ta.SMA(close, timeperiod=20)  # Simple Moving Average
+    df["BB_High"], df["BB_Mid"], df["BB_Low"] = ta.BBANDS(close, timeperiod=20, nbdevup=2, nbdevdn=2, matype=0)  # Bollinger Bands
+    df["MACD"], df["MACD_Signal"], df["MACD_Hist"] = ta.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+    return df
+
+
+def extend_indicators(engine, new_bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes indicators for new bars using only the stored warm-up window before them.
+
+    Parameters:
+    engine: SQLAlchemy engine of the tenant.
+    new_bars (pd.DataFrame): New bars with a "Date" column, ordered by date.
+
+    Returns:
+    pd.DataFrame: The new bars with the indicator columns attached.
+    """
+    query = (
+        select(Stock.Date, Stock.Open, Stock.High, Stock.Low, Stock.Close, Stock.Volume)
+        .where(Stock.Date < new_bars["Date"].min())
+        .order_by(Stock.Date.desc())
+        .limit(INDICATOR_WARMUP)
+    )
+    with engine.connect() as conn:
+        warmup = pd.read_sql_query(query, conn).iloc[::-1]
+
+    combined = compute_indicators(pd.concat([warmup, new_bars], ignore_index=True))
+    return combined.iloc[len(warmup):].reset_index(drop=True)
+
+
+def prepare_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turns a downloaded price frame into rows matching the stocks table.
+
+    Parameters:
+    df (pd.DataFrame): Bars indexed by date, as returned by get_stock.
+
+    Returns:
+    pd.DataFrame: Bars with a naive "Date" column, ordered by date and without duplicates.
+    """
+    df = df.reset_index().rename(columns={"index": "Date", "Datetime": "Date"})
+    df["Date"] = pd.to_datetime(df["Date"])
+    if df["Date"].dt.tz is not None:
+        df["Date"] = df["Date"].dt.tz_localize(None)
+    df = df.dropna(subset=["Close"]).drop_duplicates(subset="Date", keep="last").sort_values("Date")
+    return df[["Date", "Open", "High", "Low", "Close", "Volume"]].reset_index(drop=True)
+
+
+def _bar_records(bars: pd.DataFrame) -> list[dict]:
+    columns = [column.name for column in Stock.__table__.columns if column.name in bars.columns]
+    bars = bars[columns].astype(object)
+    return bars.where(bars.notna(), None).to_dict("records")
+
+
+# Rows per INSERT, keeping the bound parameters under the PostgreSQL limit
+UPSERT_CHUNK_SIZE = 4000
+
+
+def has_date_key(bind) -> bool:
+    """
+    Returns whether the stocks table exists and is keyed by Date, as upserts require.
+
+    Parameters:
+    bind: SQLAlchemy engine or connection of the tenant.
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table(Stock.__tablename__):
+        return False
+    return "Date" in inspector.get_pk_constraint(Stock.__tablename__).get("constrained_columns", [])
+
+
+def last_stored_date(engine):
+    """
+    Returns the date of the latest stored bar, or None if the table is missing, empty or
+    was created without the Date key that upserts rely on.
+
+    Parameters:
+    engine: SQLAlchemy engine of the tenant.
+    """
+    if not has_date_key(engine):
+        # Missing, or a legacy table written by pandas that needs one full rebuild first
+        return None
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(Stock.Date))).scalar()
+
+
+def upsert_bars(conn, bars: pd.DataFrame) -> int:
+    """
+    Inserts bars into the stocks table, overwriting stored bars with the same date.
+
+    Parameters:
+    conn: Open SQLAlchemy connection of the tenant.
+    bars (pd.DataFrame): Bars with indicator columns.
+
+    Returns:
+    int: The number of bars written.
+    """
+    records = _bar_records(bars)
+    for start in range(0, len(records), UPSERT_CHUNK_SIZE):
+        statement = insert(Stock).values(records[start:start + UPSERT_CHUNK_SIZE])
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[Stock.Date],
+            set_={column: statement.excluded[column] for column in records[0] if column != "Date"}
+        ))
+    return len(records)
+
+
+def rebuild_stock_table(engine, bars: pd.DataFrame) -> int:
+    """
+    Replaces the whole stock history in a single transaction.
+
+    A table keyed by Date is emptied with DELETE and refilled, so readers keep seeing the old
+    rows until the new ones are committed and are never blocked. A legacy pandas table, or a
+    missing one, is dropped and recreated instead; the drop locks out readers until commit.
+
+    Parameters:
+    engine: SQLAlchemy engine of the tenant.
+    bars (pd.DataFrame): The full bar history with indicator columns.
+
+    Raises:
+    ValueError: If there are no bars, which would wipe the stored history.
+
+    Returns:
+    int: The number of bars written.
+    """
+    if bars.empty:
+        raise ValueError("Refusing to rebuild the stocks table without any bars.")
+    with engine.begin() as conn:
+        if has_date_key(conn):
+            conn.execute(delete(Stock))
+        else:
+            Stock.__table__.drop(bind=conn, checkfirst=True)
+            Stock.__table__.create(bind=conn)
+        return upsert_bars(conn, bars)
+
+
+def write_bars(engine, bars: pd.DataFrame, last_date=None) -> int:
+    """
+    Stores downloaded bars for a tenant, incrementally when a last stored date is given.
+
+    Parameters:
+    engine: SQLAlchemy engine of the tenant.
+    bars (pd.DataFrame): Bars from prepare_bars.
+    last_date: Date of the latest stored bar, or None to rebuild the whole table.
+
+    Returns:
+    int: The number of bars written.
+    """
+    if last_date is None:
+        return rebuild_stock_table(engine, compute_indicators(bars))
+
+    # The last stored bar is refetched too, since it may have been a partial session
+    bars = bars[bars["Date"] >= last_date].reset_index(drop=True)
+    if bars.empty:
+        return 0
+    bars = extend_indicators(engine, bars)
+    with engine.begin() as conn:
+        return upsert_bars(conn, bars)
+
+
+def record_stock_info(keyword: str, stock_info: dict) -> None:
+    """
+    Adds the stock information to stocks_data.json unless the nickname is already listed.
+
+    Parameters:
+    keyword (str): The nickname of the stock.
+    stock_info (dict): The stock information returned by get_symbols.
+
+    Returns:
+    None
+    """
+    # Load existing data from JSON file
+    with open("stocks_data.json", "r+") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError:
+            data = []
+
+    # Check if the stock_info or nickname is already present
+    stock_info["nickname"] = keyword
+    if stock_info not in data and not any(item.get("nickname") == keyword for item in data):
+        data.append(stock_info)
+        with open("stocks_data.json", "w") as file:
+            json.dump(data, file, indent=4)
+        print("And updated the data file :)")
+    else:
+        print("Data already present. No update needed.")
+
+
+def store_bars(keyword: str, db_info: dict, bars: pd.DataFrame, last_date=None) -> int:
+    """
+    Writes bars for a tenant and invalidates its cached dashboard results if anything changed.
+
+    Parameters:
+    keyword (str): The tenant keyword.
+    db_info (dict): The tenant engines and session factories.
+    bars (pd.DataFrame): Bars from prepare_bars.
+    last_date: Date of the latest stored bar, or None to rebuild the whole table.
+
+    Returns:
+    int: The number of bars written.
+    """
+    written = write_bars(db_info["engine"], bars, last_date)
+    if written:
+        with get_session(db_info["SessionLocal"]) as session:
+            DataVersion.bump(session)
+        sentiment_cache.invalidate(keyword)
+    return written
+
+
+def inject_stock(keyword: str, period: str = "max", full_rebuild: bool = False, downloader=get_stock, symbol_lookup=get_symbols) -> None:
     """
     Injects stock data into the database for the given keyword.
 
+    By default only bars newer than the last stored one are downloaded and upserted. A full
+    rebuild refetches the whole history, which is needed after splits, dividends or other
+    corporate actions change the adjusted prices.
+
     Parameters:
     keyword (str): The keyword to search for related stock data.
-    period (str): The time period for the data. Default is "max".
+    period (str): The time period for a full rebuild. Default is "max".
+    full_rebuild (bool): Replace the whole table instead of appending new bars.
+    downloader (callable): Fetches bars as get_stock(symbol, period=..., start=...) does.
+    symbol_lookup (callable): Resolves the keyword as get_symbols does.
 
     Returns:
     None
     """
     db_info = create_engine_and_sessions(keyword)
     try:
-        stock_info = get_symbols(keyword)[0]
-        table = get_stock(stock_info["symbol"], period)
-        table = table.reset_index()
-        table.to_sql("stocks", con=db_info["engine"], if_exists="replace", index=False)
-        print("We sent one stocks table to space!")
-
-        # Load existing data from JSON file
-        with open("stocks_data.json", "r+") as file:
-            try:
-                data = json.load(file)
-            except json.JSONDecodeError:
-                data = []
-
-        # Check if the stock_info or nickname is already present
-        stock_info["nickname"] = keyword
-        if stock_info not in data and not any(item.get("nickname") == keyword for item in data):
-            data.append(stock_info)
-            with open("stocks_data.json", "w") as file:
-                json.dump(data, file, indent=4)
-            print("And updated the data file :)")
+        stock_info = symbol_lookup(keyword)[0]
+        last_date = None if full_rebuild else last_stored_date(db_info["engine"])
+        if last_date is None:
+            downloaded = downloader(stock_info["symbol"], period=period)
         else:
-            print("Data already present. No update needed.")
+            downloaded = downloader(stock_info["symbol"], start=last_date.date())
+        # yfinance returns an empty frame instead of raising when a request fails or is throttled
+        bars = None if downloaded is None or downloaded.empty else prepare_bars(downloaded)
+        if bars is None or bars.empty:
+            print(f"No {keyword} bars downloaded, keeping the stored ones.")
+            return
+
+        written = store_bars(keyword, db_info, bars, last_date)
+        print(f"We sent {written} {keyword} bars to space!")
+        record_stock_info(keyword, stock_info)
 
     except IndexError:
         print("Not within yahoo finance.")
 
 
+def get_stocks(symbols: list[str], period: str = "max", start=None) -> dict[str, pd.DataFrame]:
+    """
+    Downloads several symbols from Yahoo Finance in one grouped request.
+
+    Parameters:
+    symbols (list[str]): The stock symbols to download.
+    period (str): The time period for the data. Default is "max".
+    start: Only download bars from this date on. Overrides period when given.
+
+    Returns:
+    dict[str, pd.DataFrame]: The bars of each symbol, indexed by date.
+    """
+    if start is not None:
+        df = yf.download(symbols, group_by="Ticker", start=start, auto_adjust=True, threads=True)
+    else:
+        df = yf.download(symbols, group_by="Ticker", period=period, auto_adjust=True, threads=True)
+
+    downloaded = set(df.columns.get_level_values(0))
+    return {
+        symbol: df[symbol].dropna(how="all")
+        for symbol in symbols if symbol in downloaded
+    }
+
+
+def inject_stocks(keywords: list[str] = None, period: str = "max", full_rebuild: bool = False, max_workers: int = 4,
+                  batch_downloader=get_stocks, symbol_lookup=get_symbols) -> dict[str, dict]:
+    """
+    Injects stock data for many tenants with a single grouped download.
+
+    Symbols come from stocks_data.json when the nickname is listed there, so only unknown
+    keywords hit the Yahoo search. Tenants are then written concurrently by a bounded pool.
+
+    Parameters:
+    keywords (list[str]): Nicknames to ingest. Defaults to every stock in stocks_data.json.
+    period (str): The time period for tenants that need a full rebuild. Default is "max".
+    full_rebuild (bool): Replace every table instead of appending new bars.
+    max_workers (int): Number of tenants written at the same time (default is 4).
+    batch_downloader (callable): Fetches many symbols as get_stocks does.
+    symbol_lookup (callable): Resolves unknown keywords as get_symbols does.
+
+    Returns:
+    dict[str, dict]: Per-keyword symbol, written row count and seconds spent writing.
+    """
+    with open("stocks_data.json", "r") as file:
+        known = {item["nickname"]: item for item in json.load(file)}
+    keywords = keywords or list(known)
+
+    # Resolve symbols and find where each tenant stopped
+    tenants = {}
+    for keyword in keywords:
+        stock_info = known.get(keyword)
+        if stock_info is None:
+            found = symbol_lookup(keyword) or []
+            if not found:
+                print(f"{keyword} is not within yahoo finance.")
+                continue
+            stock_info = found[0]
+            record_stock_info(keyword, stock_info)
+        db_info = create_engine_and_sessions(keyword)
+        last_date = None if full_rebuild else last_stored_date(db_info["engine"])
+        tenants[keyword] = {"symbol": stock_info["symbol"], "db_info": db_info, "last_date": last_date}
+
+    if not tenants:
+        return {}
+
+    # One request for every symbol, starting where the furthest-behind tenant stopped
+    last_dates = [tenant["last_date"] for tenant in tenants.values()]
+    start_time = time.perf_counter()
+    if None in last_dates:
+        downloaded = batch_downloader(sorted({tenant["symbol"] for tenant in tenants.values()}), period=period)
+    else:
+        downloaded = batch_downloader(sorted({tenant["symbol"] for tenant in tenants.values()}), start=min(last_dates).date())
+    print(f"Downloaded {len(downloaded)} symbols in {time.perf_counter() - start_time:.2f}s")
+
+    def ingest(keyword: str) -> dict:
+        tenant = tenants[keyword]
+        started = time.perf_counter()
+        bars = downloaded.get(tenant["symbol"])
+        written = 0 if bars is None or bars.empty else store_bars(keyword, tenant["db_info"], prepare_bars(bars), tenant["last_date"])
+        return {"symbol": tenant["symbol"], "rows": written, "seconds": time.perf_counter() - started}
+
+    report = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(ingest, keyword): keyword for keyword in tenants}
+        for future in as_completed(futures):
+            keyword = futures[future]
+            try:
+                report[keyword] = future.result()
+                print(f"{keyword} ({report[keyword]['symbol']}): {report[keyword]['rows']} rows in {report[keyword]['seconds']:.2f}s")
+            except Exception as e:
+                print(f"Error ingesting {keyword}: {e}")
+
+    return report
+
+
 if __name__ == "__main__":
-    stocks_list = ["Ubisoft", "Boeing"]
-    for stock in stocks_list:
-        inject_stock(stock)
+    inject_stocks(["Ubisoft", "Boeing"])
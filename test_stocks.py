@@ -0,0 +1,140 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+
+import models
+import stocks
+from models import DataVersion, Stock
+
+STOCK_INFO = {"symbol": "TST", "name": "Test Corp", "exchange": "TST"}
+
+
+def make_bars(days: int = 400, start: str = "2022-01-03", seed: int = 0) -> pd.DataFrame:
+    """
+    Fixture price history shaped like a yfinance download: OHLCV indexed by date.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    index = pd.bdate_range(start, periods=days, name="Date")
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.5, days),
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, days),
+    }, index=index)
+
+
+class FixtureDownloader:
+    """
+    Serves bars from a frame the way get_stock does, recording each call.
+    """
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, symbol, period="max", start=None):
+        self.calls.append({"period": period, "start": start})
+        if start is None or self.bars.empty:
+            return self.bars
+        return self.bars[self.bars.index >= pd.Timestamp(start)]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tenant.db'}")
+    models.Base.metadata.create_all(engine)
+    # SQLite speaks the same ON CONFLICT upserts as the PostgreSQL statements used in production
+    monkeypatch.setattr(stocks, "insert", sqlite_insert)
+    monkeypatch.setattr(models, "insert", sqlite_insert)
+    monkeypatch.setattr(stocks, "create_engine_and_sessions", lambda keyword: {
+        "engine": engine,
+        "SessionLocal": sessionmaker(bind=engine),
+    })
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "stocks_data.json").write_text(json.dumps([]))
+    return engine
+
+
+def stored_bars(engine) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql_query(select(Stock).order_by(Stock.Date), conn)
+
+
+def data_version(engine) -> int:
+    with sessionmaker(bind=engine)() as session:
+        return DataVersion.current(session)
+
+
+def inject(downloader, full_rebuild: bool = False) -> None:
+    stocks.inject_stock("Test", full_rebuild=full_rebuild, downloader=downloader, symbol_lookup=lambda keyword: [dict(STOCK_INFO)])
+
+
+def test_incremental_update_matches_full_history(engine):
+    history = make_bars(410)
+    inject(FixtureDownloader(history.iloc[:400]))
+    assert len(stored_bars(engine)) == 400
+
+    downloader = FixtureDownloader(history)
+    inject(downloader)
+
+    # Only bars from the last stored date on are requested
+    assert downloader.calls[-1]["start"] == history.index[399].date()
+    stored = stored_bars(engine)
+    assert len(stored) == 410
+    expected = stocks.compute_indicators(stocks.prepare_bars(history))
+    for column in ["SMA", "BB_High", "BB_Low", "MACD", "MACD_Signal", "MACD_Hist"]:
+        np.testing.assert_allclose(stored[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float), rtol=1e-6, equal_nan=True)
+    assert data_version(engine) == 2
+
+
+def test_full_rebuild_replaces_history(engine):
+    inject(FixtureDownloader(make_bars(400)))
+    adjusted = make_bars(300, seed=1)
+    downloader = FixtureDownloader(adjusted)
+    inject(downloader, full_rebuild=True)
+
+    assert downloader.calls[-1] == {"period": "max", "start": None}
+    stored = stored_bars(engine)
+    assert len(stored) == 300
+    np.testing.assert_allclose(stored["Close"].to_numpy(), adjusted["Close"].to_numpy())
+
+
+@pytest.mark.parametrize("full_rebuild", [False, True])
+def test_empty_download_keeps_stored_history(engine, full_rebuild):
+    inject(FixtureDownloader(make_bars(400)))
+    before = stored_bars(engine)
+    version = data_version(engine)
+
+    inject(FixtureDownloader(pd.DataFrame()), full_rebuild=full_rebuild)
+
+    pd.testing.assert_frame_equal(stored_bars(engine), before)
+    assert data_version(engine) == version
+
+
+def test_rebuild_refuses_empty_bars(engine):
+    inject(FixtureDownloader(make_bars(50)))
+    empty = stocks.prepare_bars(make_bars(1)).iloc[:0]
+
+    with pytest.raises(ValueError):
+        stocks.rebuild_stock_table(engine, empty)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Stock)).scalar() == 50
+
+
+def test_rebuild_replaces_legacy_table(engine):
+    # Tables written by pandas' to_sql have no Date key to upsert on
+    Stock.__table__.drop(engine)
+    stocks.prepare_bars(make_bars(10)).to_sql(Stock.__tablename__, engine)
+    assert not stocks.has_date_key(engine)
+
+    stocks.rebuild_stock_table(engine, stocks.compute_indicators(stocks.prepare_bars(make_bars(30))))
+
+    assert stocks.has_date_key(engine)
+    assert len(stored_bars(engine)) == 30
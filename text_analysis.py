@@ -1,13 +1,208 @@
-from transformers import pipeline
 from rake_nltk import Rake
 from nltk.tokenize import word_tokenize
-from models import RedditPost, News
-from db_manager import create_engine_and_sessions, get_session
-from typing import List, Tuple
+from models import DailyTermCount, DailyWordCount, DataVersion, NewsKeyword, PostKeyword, RedditPost, News, migrate_database
+from sqlalchemy import delete, insert, or_, select
+from result_cache import sentiment_cache
+from word_counts import count_words
+from score_cache import create_score_cache, evict_scores, lookup_scores, score_cache_engine, store_scores, text_hash
+from db_manager import STREAM_CHUNK_SIZE, bulk_update, create_engine_and_sessions, get_session, stream_rows
+from collections import Counter, defaultdict
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
 
 # Initialize Rake for keyword extraction
 r = Rake(max_length=4, word_tokenizer=word_tokenize, include_repeated_phrases=False)
 
+SENTIMENT_MODELS = {
+    "news": "ProsusAI/finbert",
+    "text": "Falcontreras/Tiny_Sentiment_Tunning",
+}
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_BATCH_TOKENS = 8192
+
+# "auto" picks CUDA when available; "int8" runs a dynamically quantized copy of the model on CPU
+SENTIMENT_DEVICE = os.getenv("SENTIMENT_DEVICE", "auto")
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "fp32")
+
+# Process-level registry: each model is loaded from disk once and reused by every call
+_pipelines: Dict[Tuple[str, str, str], object] = {}
+_pipelines_lock = threading.Lock()
+
+
+def resolve_device(device: str = None) -> str:
+    """
+    Resolve the configured inference device, falling back to CPU when CUDA is missing.
+
+    Parameters:
+    device (str): "auto", "cpu" or a CUDA device such as "cuda:0". Defaults to SENTIMENT_DEVICE.
+
+    Returns:
+    str: The device the models will run on.
+    """
+    import torch
+
+    device = device or SENTIMENT_DEVICE
+    if device == "auto" or (device.startswith("cuda") and not torch.cuda.is_available()):
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    return device
+
+
+def _load_pipeline(model: str, backend: str, device: str):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    if backend == "fp32":
+        return pipeline("text-classification", model=model, device=device)
+    if backend == "int8":
+        import torch
+
+        # Dynamic quantization stores Linear weights as int8 and only runs on CPU
+        classifier = AutoModelForSequenceClassification.from_pretrained(model)
+        classifier = torch.ao.quantization.quantize_dynamic(classifier, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("text-classification", model=classifier, tokenizer=AutoTokenizer.from_pretrained(model), device="cpu")
+    raise ValueError(f"Invalid sentiment backend: {backend}")
+
+
+def get_pipeline(text_type: str, backend: str = None, device: str = None):
+    """
+    Return the text-classification pipeline for the given text type, loading it on first use.
+
+    Parameters:
+    text_type (str): "text" or "news" to control which model is used.
+    backend (str): "fp32" or "int8". Defaults to SENTIMENT_BACKEND.
+    device (str): The inference device. Defaults to SENTIMENT_DEVICE.
+
+    Raises:
+    ValueError: If the text_type is neither "text" nor "news", or the backend is unknown.
+
+    Returns:
+    transformers.Pipeline: The loaded pipeline.
+    """
+    model = SENTIMENT_MODELS.get(text_type)
+    if model is None:
+        raise ValueError("Invalid text_type")
+    backend = backend or SENTIMENT_BACKEND
+    device = "cpu" if backend == "int8" else resolve_device(device)
+
+    key = (model, backend, device)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            _pipelines[key] = _load_pipeline(model, backend, device)
+        return _pipelines[key]
+
+
+def sentiment_model_version(text_type: str, backend: str = None) -> str:
+    """
+    Identify the model and backend that produce a score, as stored next to each scored row.
+
+    Parameters:
+    text_type (str): "text" or "news".
+    backend (str): "fp32" or "int8". Defaults to SENTIMENT_BACKEND.
+
+    Returns:
+    str: The model version, e.g. "ProsusAI/finbert:fp32".
+    """
+    return f"{SENTIMENT_MODELS[text_type]}:{backend or SENTIMENT_BACKEND}"
+
+
+def _signed_score(sentiment: dict) -> float:
+    """
+    Turn a classifier prediction into a score in [-1, 1]: positive labels count up, negative down.
+    """
+    if sentiment["label"] in ["LABEL_1", "positive"]:
+        return sentiment["score"]
+    if sentiment["label"] in ["LABEL_0", "negative"]:
+        return -sentiment["score"]
+    return 0
+
+
+def token_budget_batches(lengths: List[int], max_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Group text positions into batches of similar length whose padded size fits a token budget.
+
+    Texts are sorted by token length, so each batch is padded only up to its own longest text.
+
+    Parameters:
+    lengths (List[int]): Token length of each text.
+    max_tokens (int): Budget of padded tokens per batch (batch size times longest length).
+    max_batch_size (int): Upper bound on texts per batch.
+
+    Returns:
+    List[List[int]]: Batches of positions into the original list.
+    """
+    batches = []
+    current = []
+    for position in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending, so the newest text is the longest of the batch
+        padded = (len(current) + 1) * lengths[position]
+        if current and (padded > max_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        current.append(position)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def score_texts(text_type: str, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, backend: str = None,
+                max_tokens: int = DEFAULT_MAX_BATCH_TOKENS, stats: dict = None, device: str = None) -> List[Tuple[float, str]]:
+    """
+    Score many texts with the cached model, running inference in length-bucketed batches.
+
+    Texts are grouped by token length into batches under a padded-token budget, so short
+    news titles are not padded to the length of the longest Reddit post, and the scores are
+    put back in input order.
+
+    Parameters:
+    text_type (str): "text" or "news" to control which model is used for the analysis.
+    texts (Iterable[str]): The texts to be analyzed.
+    batch_size (int): Maximum number of texts sent through the model at once (default is 32).
+    backend (str): "fp32" or "int8". Defaults to SENTIMENT_BACKEND.
+    max_tokens (int): Padded-token budget per batch (default is 8192).
+    stats (dict): Optional dict that receives texts, tokens, seconds and throughput figures.
+    device (str): The inference device. Defaults to SENTIMENT_DEVICE.
+
+    Raises:
+    ValueError: If the text_type is neither "text" nor "news".
+
+    Returns:
+    List[Tuple[float, str]]: The sentiment score and label of each text, in input order.
+    """
+    pipe = get_pipeline(text_type, backend, device)
+    texts = list(texts)
+    if not texts:
+        return []
+
+    start = time.perf_counter()
+    lengths = [len(ids) for ids in pipe.tokenizer(texts, truncation=True)["input_ids"]]
+
+    scores = [None] * len(texts)
+    for batch in token_budget_batches(lengths, max_tokens, batch_size):
+        predictions = pipe([texts[position] for position in batch], batch_size=len(batch), truncation=True)
+        for position, sentiment in zip(batch, predictions):
+            score = _signed_score(sentiment)
+            scores[position] = (score, "positive" if score > 0 else "negative")
+
+    elapsed = time.perf_counter() - start
+    run_stats = {
+        "texts": len(texts),
+        "tokens": sum(lengths),
+        "seconds": elapsed,
+        "texts_per_second": len(texts) / elapsed if elapsed else 0.0,
+        "tokens_per_second": sum(lengths) / elapsed if elapsed else 0.0,
+    }
+    if stats is not None:
+        stats.update(run_stats)
+    print(f"Scored {run_stats['texts']} {text_type} texts: {run_stats['texts_per_second']:.1f} texts/s, {run_stats['tokens_per_second']:.1f} tokens/s")
+    return scores
+
+
 def analyze_sentiments(text_type: str, elements: List[str]) -> Tuple[float, str]:
     """
     Analyze the sentiments of a list of text elements.
@@ -22,23 +217,7 @@ def analyze_sentiments(text_type: str, elements: List[str]) -> Tuple[float, str]
     Returns:
     Tuple[float, str]: The average sentiment score and overall sentiment label.
     """
-    device = "cuda"
-    model = "ProsusAI/finbert" if text_type == "news" else "Falcontreras/Tiny_Sentiment_Tunning" if text_type == "text" else None
-    if model is None:
-        raise ValueError("Invalid text_type")
-    
-    pipe = pipeline("text-classification", model=model, device=device)
-
-    total_score = 0
-    
-    for element in elements:
-        sentiment = pipe(element)
-        label = sentiment[0]["label"]
-        score = sentiment[0]["score"]
-        if label in ["LABEL_1", "positive"]:
-            total_score += score
-        elif label in ["LABEL_0", "negative"]:
-            total_score -= score
+    total_score = sum(score for score, _ in score_texts(text_type, elements))
 
     total_sentiment = "positive" if total_score > 0 else "negative"
     total_score = total_score / len(elements)
@@ -60,53 +239,129 @@ def analyze_sentiment(text_type: str, element: str) -> Tuple[float, str]:
     Returns:
     Tuple[float, str]: The sentiment score and sentiment label.
     """
-    device = "cuda"
-    model = "ProsusAI/finbert" if text_type == "news" else "Falcontreras/Tiny_Sentiment_Tunning" if text_type == "text" else None
-    if model is None:
-        raise ValueError("Invalid text_type")
-    
-    pipe = pipeline("text-classification", model=model, device=device)
+    return score_texts(text_type, [element])[0]
 
-    total_score = 0
 
-    sentiment = pipe(element)
-    label = sentiment[0]["label"]
-    score = sentiment[0]["score"]
-    if label in ["LABEL_1", "positive"]:
-        total_score += score
-    elif label in ["LABEL_0", "negative"]:
-        total_score -= score
+def extract_keywords(text: str, min_score: int = 10, rake: Rake = None) -> List[Tuple[str, float]]:
+    """
+    Extract important keywords from the given text using Rake, with their scores.
 
-    total_sentiment = "positive" if total_score > 0 else "negative"
+    Parameters:
+    text (str): The text to extract keywords from.
+    min_score (int): Minimum score for extracted keywords to be considered (default is 10).
+    rake (Rake): The extractor to use. Defaults to the module-level NLTK-tokenized one.
 
-    return total_score, total_sentiment
+    Returns:
+    List[Tuple[str, float]]: The keywords and their scores, best first.
+    """
+    rake = rake or r
+    rake.extract_keywords_from_text(text)
+    return [(word, score) for score, word in rake.get_ranked_phrases_with_scores() if score > min_score]
 
 
-def extract_words(text: str, min_score: int = 10) -> str:
+def extract_words(text: str, min_score: int = 10, rake: Rake = None) -> str:
     """
     Extract important keywords from the given text using Rake.
 
     Parameters:
     text (str): The text to extract keywords from.
     min_score (int): Minimum score for extracted keywords to be considered (default is 10).
+    rake (Rake): The extractor to use. Defaults to the module-level NLTK-tokenized one.
 
     Returns:
     str: A comma-separated string of extracted keywords.
     """
-    all_words = ""
-    r.extract_keywords_from_text(text)
-    words = r.get_ranked_phrases_with_scores()
-    
-    for word in words:
-        if word[0] > min_score:
-            all_words += word[1] + ", "
-    return all_words
+    return "".join(f"{word}, " for word, _ in extract_keywords(text, min_score, rake))
+
+
+# Words (keeping inner apostrophes) and single punctuation marks, which Rake uses as phrase breaks
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*|[^\w\s]")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+KEYWORD_WORKERS = int(os.getenv("KEYWORD_WORKERS", "1"))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in SENTENCE_PATTERN.split(text) if sentence]
+
+
+def fast_rake() -> Rake:
+    """
+    Build a Rake extractor that splits sentences and words with regular expressions instead of NLTK.
+
+    Returns:
+    Rake: The extractor, with the same settings as the module-level one.
+    """
+    return Rake(
+        max_length=4,
+        include_repeated_phrases=False,
+        sentence_tokenizer=split_sentences,
+        word_tokenizer=WORD_PATTERN.findall,
+    )
+
+
+# One extractor per keyword worker process, built by the pool initializer
+_worker_rake = None
+
+
+def _init_keyword_worker() -> None:
+    global _worker_rake
+    _worker_rake = fast_rake()
+
+
+def _extract_shard(ids: List[int], texts: List[str], min_score: int):
+    # Runs in a worker process
+    return ids, [extract_keywords(text, min_score=min_score, rake=_worker_rake) for text in texts]
+
+
+def keyword_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Start the worker processes used by `extract_rows_parallel`, each holding its own Rake.
+
+    Parameters:
+    workers (int): Number of worker processes.
+
+    Returns:
+    ProcessPoolExecutor: The pool, to be used as a context manager.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_keyword_worker)
+
+
+def extract_rows_parallel(rows: List[Tuple[int, str]], min_score: int, workers: int, shard_size: int = 500,
+                          executor: ProcessPoolExecutor = None):
+    """
+    Extract keywords of (id, text) rows on several worker processes, yielding results shard by shard.
+
+    Parameters:
+    rows (List[Tuple[int, str]]): Row ids and the text to extract keywords from.
+    min_score (int): Minimum score for extracted keywords to be considered.
+    workers (int): Number of worker processes.
+    shard_size (int): Rows sent to a worker per task (default is 500).
+    executor (ProcessPoolExecutor): A pool from `keyword_pool` to reuse. A new one is started when omitted.
+
+    Yields:
+    List[Tuple[int, List[Tuple[str, float]]]]: The id and scored keywords of each row of a finished shard.
+    """
+    if executor is None:
+        with keyword_pool(workers) as executor:
+            yield from extract_rows_parallel(rows, min_score, workers, shard_size, executor)
+        return
+
+    futures = [
+        executor.submit(_extract_shard, [row_id for row_id, _ in rows[start:start + shard_size]],
+                        [text for _, text in rows[start:start + shard_size]], min_score)
+        for start in range(0, len(rows), shard_size)
+    ]
+    for future in as_completed(futures):
+        ids, keywords = future.result()
+        yield list(zip(ids, keywords))
 
 
 def make_analysis(keyword: str, min_score: int = 7):
     """
     Perform sentiment and keyword analysis on Reddit posts and news articles related to the given keyword.
 
+    Rows are streamed in chunks, so memory use does not grow with the size of the tenant.
+
     Parameters:
     keyword (str): The keyword to search for.
     min_score (int): Minimum score for extracted keywords to be considered (default is 7).
@@ -114,81 +369,354 @@ def make_analysis(keyword: str, min_score: int = 7):
     Returns:
     dict: A dictionary containing sentiment analysis and important keywords.
     """
-    db_details = create_engine_and_sessions(keyword)
-    with get_session(db_details["SessionLocal"]) as session:
-        all_posts = session.query(RedditPost).all()
-        all_news = [news.title for news in session.query(News).all()]
-        all_content = [post.title + "\n" + post.content for post in all_posts]
-        return {
-            "sentiment_text": analyze_sentiment("text", all_content),
-            "sentiment_news": analyze_sentiment("news", all_news),
-            "important_words": sorted(extract_words(all_content, min_score=min_score), key=lambda x: x[0], reverse=True),
-        }
+    engine = create_engine_and_sessions(keyword)["engine"]
+    words = Counter()
+    rake = fast_rake()
+
+    def stream_sentiment(statement, text_type: str, with_words: bool = False) -> Tuple[float, str]:
+        total_score = 0
+        count = 0
+        for chunk in stream_rows(engine, statement):
+            texts = ["\n".join(filter(None, row)) for row in chunk]
+            total_score += sum(score for score, _ in score_texts(text_type, texts))
+            count += len(texts)
+            if with_words:
+                for text in texts:
+                    words.update(word for word in extract_words(text, min_score=min_score, rake=rake).split(", ") if word)
+        total_sentiment = "positive" if total_score > 0 else "negative"
+        return (total_score / count if count else 0), total_sentiment
+
+    return {
+        "sentiment_text": stream_sentiment(select(RedditPost.title, RedditPost.content), "text", with_words=True),
+        "sentiment_news": stream_sentiment(select(News.title), "news"),
+        "important_words": sorted(((count, word) for word, count in words.items()), key=lambda x: x[0], reverse=True),
+    }
+
+
+def _init_scoring_worker(threads: int) -> None:
+    """
+    Pin the intra-op thread count of a scoring worker so N workers do not oversubscribe the cores.
+    """
+    for variable in ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]:
+        os.environ[variable] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
 
+def _score_shard(text_type: str, ids: List[int], texts: List[str], batch_size: int, max_tokens: int, backend: str):
+    # Runs in a worker process; the model registry keeps one pipeline per worker
+    return ids, score_texts(text_type, texts, batch_size, backend=backend, max_tokens=max_tokens)
 
-def update_sentiment(db: str):
+
+def scoring_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Start the worker processes used by `score_rows_parallel`.
+
+    Keep the pool open across chunks so each worker loads the model only once.
+
+    Parameters:
+    workers (int): Number of worker processes.
+
+    Returns:
+    ProcessPoolExecutor: The pool, to be used as a context manager.
+    """
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # Spawned workers start without any torch state inherited from the parent
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_scoring_worker, initargs=(threads,))
+
+
+def score_rows_parallel(text_type: str, rows: List[Tuple[int, str]], workers: int, shard_size: int = 1024,
+                        batch_size: int = DEFAULT_BATCH_SIZE, max_tokens: int = DEFAULT_MAX_BATCH_TOKENS, backend: str = None,
+                        executor: ProcessPoolExecutor = None):
+    """
+    Score (id, text) rows on several CPU worker processes, yielding results shard by shard.
+
+    Each worker loads the model once and gets an equal share of the cores. Shards are yielded
+    as soon as they finish, so the caller can write them back while the others still run.
+
+    Parameters:
+    text_type (str): "text" or "news" to control which model is used for the analysis.
+    rows (List[Tuple[int, str]]): Row ids and the text to score for each.
+    workers (int): Number of worker processes.
+    shard_size (int): Rows sent to a worker per task (default is 1024).
+    batch_size (int): Maximum number of texts sent through the model at once (default is 32).
+    max_tokens (int): Padded-token budget per batch (default is 8192).
+    backend (str): "fp32" or "int8". Defaults to SENTIMENT_BACKEND.
+    executor (ProcessPoolExecutor): A pool from `scoring_pool` to reuse. A new one is started when omitted.
+
+    Yields:
+    List[Tuple[int, float, str]]: The id, score and label of each row of a finished shard.
+    """
+    if executor is None:
+        with scoring_pool(workers) as executor:
+            yield from score_rows_parallel(text_type, rows, workers, shard_size, batch_size, max_tokens, backend, executor)
+        return
+
+    futures = []
+    for start in range(0, len(rows), shard_size):
+        shard = rows[start:start + shard_size]
+        futures.append(executor.submit(
+            _score_shard, text_type, [row_id for row_id, _ in shard], [text for _, text in shard],
+            batch_size, max_tokens, backend
+        ))
+
+    for future in as_completed(futures):
+        ids, scores = future.result()
+        yield [(row_id, score, label) for row_id, (score, label) in zip(ids, scores)]
+
+
+def _score_and_store(session, model, text_type: str, rows: List[Tuple[int, str]], workers: int, batch_size: int, max_tokens: int,
+                     executor: ProcessPoolExecutor = None) -> int:
+    """
+    Score a chunk of rows and write the scores back, per shard when running on several workers.
+
+    Texts already scored by the same model version, in this tenant or any other, are taken
+    from the shared score cache; only unseen texts are sent through the model, once each.
+
+    Returns:
+    int: The number of rows served from the score cache.
+    """
+    if not rows:
+        return 0
+    model_version = sentiment_model_version(text_type)
+    engine = score_cache_engine()
+
+    # Group rows by normalized text so each distinct text is looked up and scored once
+    rows_by_hash = defaultdict(list)
+    texts_by_hash = {}
+    for row_id, text in rows:
+        digest = text_hash(text)
+        rows_by_hash[digest].append(row_id)
+        texts_by_hash.setdefault(digest, text)
+
+    cached = lookup_scores(engine, model_version, rows_by_hash)
+    hits = sum(len(rows_by_hash[digest]) for digest in cached)
+
+    pending = [(digest, text) for digest, text in texts_by_hash.items() if digest not in cached]
+    if workers > 1:
+        # Two shards per worker keep every worker busy on a chunk and balance uneven shards
+        shard_size = max(1, math.ceil(len(pending) / (workers * 2)))
+        scored_shards = score_rows_parallel(text_type, pending, workers, shard_size, batch_size=batch_size, max_tokens=max_tokens,
+                                            executor=executor)
+    else:
+        scores = score_texts(text_type, (text for _, text in pending), batch_size, max_tokens=max_tokens)
+        scored_shards = [[(digest, score, label) for (digest, _), (score, label) in zip(pending, scores)]]
+
+    def write(scored: Dict[str, Tuple[float, str]]) -> None:
+        # Single writer: only this process touches the database
+        bulk_update(session, model, [
+            {"id": row_id, "sentiment_score": score, "sentiment_label": label, "sentiment_model": model_version}
+            for digest, (score, label) in scored.items()
+            for row_id in rows_by_hash[digest]
+        ])
+
+    write(cached)
+    for scored in scored_shards:
+        if not scored:
+            continue
+        new_scores = {digest: (score, label) for digest, score, label in scored}
+        store_scores(engine, model_version, new_scores)
+        write(new_scores)
+    return hits
+
+
+def _needs_sentiment(model, text_type: str):
+    """
+    Filter for rows without a score, or scored by another model or backend than the current one.
+    """
+    return or_(model.sentiment_score.is_(None), model.sentiment_model.is_distinct_from(sentiment_model_version(text_type)))
+
+
+def update_sentiment(db: str, batch_size: int = DEFAULT_BATCH_SIZE, max_tokens: int = DEFAULT_MAX_BATCH_TOKENS, workers: int = 1,
+                     incremental: bool = True, chunk_size: int = STREAM_CHUNK_SIZE):
     """
     Update the sentiment scores and labels for Reddit posts and news articles in the database.
 
+    Only ids and texts are read, through a server-side cursor, and each chunk is scored and
+    committed before the next one is fetched, so memory stays flat whatever the tenant size.
+
     Parameters:
     db (str): The name of the database.
+    batch_size (int): Maximum number of texts sent through the model at once (default is 32).
+    max_tokens (int): Padded-token budget per batch (default is 8192).
+    workers (int): Number of CPU worker processes scoring shards in parallel (default is 1).
+    incremental (bool): Only score rows that are unscored or were scored by another model version.
+    chunk_size (int): Number of rows read and written back at a time (default is STREAM_CHUNK_SIZE).
 
     Returns:
     None
     """
     db_info = create_engine_and_sessions(db)
-    with get_session(db_info["SessionLocal"]) as session:
-        posts = session.query(RedditPost).all()
-        update_post = []
-        update_news = []
-        for post in posts:
-            combined_text = f"{post.title}\n{post.content}"
-            score, label = analyze_sentiment("text", combined_text)
-            update_post.append({
-                "id": post.id,
-                "sentiment_score": score,
-                "sentiment_label": label
-            })
-        session.bulk_update_mappings(RedditPost, update_post)
-        session.commit()
+    engine = db_info["engine"]
+    migrate_database(engine)
+    create_score_cache(score_cache_engine())
+
+    post_query = select(RedditPost.id, RedditPost.title, RedditPost.content)
+    news_query = select(News.id, News.title)
+    if incremental:
+        post_query = post_query.where(_needs_sentiment(RedditPost, "text"))
+        news_query = news_query.where(_needs_sentiment(News, "text"))
+
+    executor = scoring_pool(workers) if workers > 1 else None
+    scored_rows = 0
+    cache_hits = 0
+    try:
+        # Reads stream on their own connection; the session is only used to write chunks back
+        with get_session(db_info["SessionLocal"]) as session:
+            for chunk in stream_rows(engine, post_query, chunk_size):
+                posts = [(post.id, f"{post.title}\n{post.content}") for post in chunk]
+                cache_hits += _score_and_store(session, RedditPost, "text", posts, workers, batch_size, max_tokens, executor)
+                scored_rows += len(posts)
+            for chunk in stream_rows(engine, news_query, chunk_size):
+                news = [(new.id, new.title) for new in chunk]
+                cache_hits += _score_and_store(session, News, "text", news, workers, batch_size, max_tokens, executor)
+                scored_rows += len(news)
+
+            if not scored_rows:
+                print(f"No new rows to score for {db}.")
+                return
+            print(f"Score cache hit rate for {db}: {cache_hits / scored_rows:.1%} ({cache_hits}/{scored_rows} rows)")
+
+            DataVersion.bump(session)
+            session.commit()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    evict_scores(score_cache_engine())
+    sentiment_cache.invalidate(db)
+
+
+def keywords_version(min_score: int) -> str:
+    """
+    Identify the extractor settings that produce a row's keywords.
+
+    Parameters:
+    min_score (int): Minimum score for extracted keywords.
 
-        news = session.query(News).all()
-        for new in news:
-            nscore, nlabel = analyze_sentiment("text", new.title)
-            update_news.append({
-                "id": new.id,
-                "sentiment_score": nscore,
-                "sentiment_label": nlabel,
-            })
-        
-        session.bulk_update_mappings(News, update_news)
+    Returns:
+    str: The keywords version stored next to each processed row.
+    """
+    return f"rake-regex:max4:min{min_score}"
+
+
+def _store_keywords(session, model, document_id, rows, extracted, version: str) -> set:
+    """
+    Write a chunk of extracted keywords to the document rows and to the normalized keyword table.
+
+    Returns:
+    set: The days touched by the chunk, whose term rollup needs refreshing.
+    """
+    keyword_model = document_id.class_
+    dates = {row_id: date for row_id, date, _ in rows}
+    session.execute(delete(keyword_model).where(document_id.in_(list(dates))))
+    keyword_rows = [
+        {document_id.key: row_id, "term": term, "score": score, "date": dates[row_id]}
+        for row_id, keywords in extracted
+        for term, score in keywords
+    ]
+    if keyword_rows:
+        session.execute(insert(keyword_model), keyword_rows)
+    bulk_update(session, model, [
+        {"id": row_id, "keywords": "".join(f"{term}, " for term, _ in keywords), "keywords_version": version}
+        for row_id, keywords in extracted
+    ])
+    return {date.date() for date in dates.values() if date is not None}
+
+
+def _refresh_word_counts(session, engine, source: str, date_column, text_columns, days, days_per_query: int = 31) -> None:
+    """
+    Recount the words of every document of the given days and replace their daily word counts.
+
+    Whole days are recounted, so documents ingested earlier on the same day are kept and
+    re-processed ones are not counted twice.
+    """
+    days = sorted(days)
+    for start in range(0, len(days), days_per_query):
+        batch = days[start:start + days_per_query]
+        counts_by_day = {day: Counter() for day in batch}
+        query = (
+            select(date_column, *text_columns)
+            .where(date_column >= batch[0], date_column < batch[-1] + timedelta(days=1))
+        )
+        for chunk in stream_rows(engine, query):
+            for row in chunk:
+                day = row[0].date()
+                if day in counts_by_day:
+                    counts_by_day[day].update(count_words("\n".join(filter(None, row[1:]))))
+        DailyWordCount.replace_days(session, source, counts_by_day)
         session.commit()
 
 
-def update_words(db: str, min_score: int = 10):
+def update_words(db: str, min_score: int = 10, incremental: bool = True, chunk_size: int = STREAM_CHUNK_SIZE,
+                 workers: int = KEYWORD_WORKERS):
     """
-    Update the keywords for Reddit posts in the database.
+    Update the keywords for Reddit posts and news articles in the database.
+
+    Rows are streamed in chunks through a server-side cursor and each chunk is written back
+    before the next one is fetched. With several workers, each chunk is spread over a process
+    pool in which every worker keeps its own Rake.
+
+    Keywords are stored both as a comma-joined string on each row and one row per term in
+    post_keywords / news_keywords; the per-day term counts of every touched day are then
+    recomputed in daily_term_counts, and its word counts in daily_word_counts for the word clouds.
 
     Parameters:
     db (str): The name of the database.
     min_score (int): Minimum score for extracted keywords to be considered (default is 10).
+    incremental (bool): Only process rows without keywords or extracted with other settings.
+    chunk_size (int): Number of rows read and written back at a time (default is STREAM_CHUNK_SIZE).
+    workers (int): Number of worker processes extracting keywords (default is KEYWORD_WORKERS).
 
     Returns:
     None
     """
+    version = keywords_version(min_score)
     db_info = create_engine_and_sessions(db)
-    with get_session(db_info["SessionLocal"]) as session:
-        posts = session.query(RedditPost).all()
-        update_post = []
-        for post in posts:
-            combined_text = f"{post.title}\n{post.content}"
-            keywords = extract_words(combined_text, min_score=min_score)
-            update_post.append({
-                "id": post.id,
-                "keywords": keywords,
-            })
-        session.bulk_update_mappings(RedditPost, update_post)
-        session.commit()
+    engine = db_info["engine"]
+    migrate_database(engine)
+
+    sources = [
+        ("post", RedditPost, PostKeyword.post_id, [RedditPost.title, RedditPost.content]),
+        ("news", News, NewsKeyword.news_id, [News.title]),
+    ]
+    rake = fast_rake()
+    executor = keyword_pool(workers) if workers > 1 else None
+    processed_rows = 0
+    try:
+        with get_session(db_info["SessionLocal"]) as session:
+            for source, model, document_id, text_columns in sources:
+                query = select(model.id, model.date, *text_columns)
+                if incremental:
+                    query = query.where(or_(model.keywords.is_(None), model.keywords_version.is_distinct_from(version)))
+
+                touched_days = set()
+                for chunk in stream_rows(engine, query, chunk_size):
+                    rows = [(row[0], row[1], "\n".join(filter(None, row[2:]))) for row in chunk]
+                    if executor is not None:
+                        pending = [(row_id, text) for row_id, _, text in rows]
+                        extracted = [pair for shard in extract_rows_parallel(pending, min_score, workers, executor=executor) for pair in shard]
+                    else:
+                        extracted = [(row_id, extract_keywords(text, min_score=min_score, rake=rake)) for row_id, _, text in rows]
+                    touched_days |= _store_keywords(session, model, document_id, rows, extracted, version)
+                    processed_rows += len(rows)
+
+                DailyTermCount.refresh(session, source, touched_days)
+                session.commit()
+                _refresh_word_counts(session, engine, source, model.date, text_columns, touched_days)
+
+            if not processed_rows:
+                print(f"No new rows to extract keywords from for {db}.")
+                return
+
+            DataVersion.bump(session)
+            session.commit()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    sentiment_cache.invalidate(db)
 
 
 if __name__ == "__main__":
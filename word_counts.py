@@ -0,0 +1,23 @@
+from typing import Dict
+
+from wordcloud import STOPWORDS, WordCloud
+
+custom_stopwords = set(STOPWORDS)
+custom_stopwords.update(["anything", "anyone"])
+
+# Only used for its tokenizer: counting never lays out or draws a cloud
+_counter = WordCloud(stopwords=custom_stopwords)
+
+
+def count_words(text: str) -> Dict[str, int]:
+    """
+    Count the words of a text the way WordCloud.generate would before drawing it.
+
+    Parameters:
+    text (str): The text to count.
+
+    Returns:
+    Dict[str, int]: Word (or collocation) counts, stopwords removed.
+    """
+    return _counter.process_text(text) if text else {}
+